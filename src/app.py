@@ -3,112 +3,118 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # サーバー起動時
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 import json
+import hmac
+import time
 from datetime import datetime
 from typing import Dict, List, Any
 from config import Config
 from utils.openai_utils import SimpleTaskJudgeSystem
+from utils.traffic_recorder import TrafficRecorder, RecordedJudgeSystem
+from utils.scenario_catalog import ScenarioCatalog, ScenarioNotFoundError
+from utils.job_queue import JudgmentJobQueue, JobQueueFullError
+from utils.binary_protocol import BinaryTelemetryServer, observation_to_text, compact_decision
+from utils.timer_wheel import TimerWheel
+from utils.task_scheduler import TaskDeadlineScheduler
+from utils.profiler import RequestProfiler, ProfilerBusyError, render_capture
+from task_manager import TaskManager, SessionStore
 
 app = Flask(__name__)
 CORS(app)
 
-class TaskManager:
-    def __init__(self, tasks_file='tasks/tasks.json'):
-        self.tasks_file = tasks_file
-        self.load_tasks()
-    
-    def load_tasks(self):
-        """JSONファイルからタスクデータを読み込み"""
-        try:
-            with open(self.tasks_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.task_metadata = data.get('task_metadata', {})
-                self.tasks = data.get('tasks', {})
-                self.task_order = data.get('task_order', [])
-                self.current_step = data.get('current_step', self.task_order[0] if self.task_order else "step1")
-                print(f"✓ タスクデータを読み込みました: {len(self.tasks)}個のタスク")
-        except FileNotFoundError:
-            print(f"⚠️ {self.tasks_file} が見つかりません。デフォルトタスクを使用します。")
-            self._create_default_tasks()
-        except json.JSONDecodeError as e:
-            print(f"⚠️ {self.tasks_file} の読み込みエラー: {e}")
-            self._create_default_tasks()
-    
-    def _create_default_tasks(self):
-        """デフォルトタスクを作成（フォールバック）"""
-        self.task_metadata = {
-            "title": "研究室Zoom会議準備タスク",
-            "total_steps": 7
-        }
-        self.tasks = {
-            "step1": {"description": "中会議室のカギを開ける", "completed": False},
-            "step2": {"description": "MacBookと充電器とUSBポートを用意する", "completed": False},
-            "step3": {"description": "みんながPCを充電する用の延長ケーブルをつなぐ", "completed": False},
-            "step4": {"description": "Macで研究室Zoomにつなぐ", "completed": False},
-            "step5": {"description": "Owlカメラとyamahaのマイクとスクリーンつける", "completed": False},
-            "step6": {"description": "こいつらをUSBポート介してUSBとHDMIでMacにつなぐ", "completed": False},
-            "step7": {"description": "Zoomのカメラ＆マイクON", "completed": False}
-        }
-        self.task_order = ["step1", "step2", "step3", "step4", "step5", "step6", "step7"]
-        self.current_step = "step1"
-    
-    def save_tasks(self):
-        """現在のタスク状態をJSONファイルに保存"""
-        try:
-            # ディレクトリが存在しない場合は作成
-            os.makedirs(os.path.dirname(self.tasks_file), exist_ok=True)
-            
-            data = {
-                "task_metadata": self.task_metadata,
-                "tasks": self.tasks,
-                "task_order": self.task_order,
-                "current_step": self.current_step
-            }
-            with open(self.tasks_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            print("✓ タスク状態を保存しました")
-        except Exception as e:
-            print(f"⚠️ タスク保存エラー: {e}")
-    
-    def get_current_task(self):
-        current_task_data = self.tasks.get(self.current_step, {})
-        return {
-            "step": self.current_step,
-            "task": current_task_data,
-            "progress": f"{self.task_order.index(self.current_step) + 1}/{len(self.task_order)}",
-            "metadata": self.task_metadata
-        }
-    
-    def complete_current_task(self):
-        self.tasks[self.current_step]["completed"] = True
-        current_index = self.task_order.index(self.current_step)
-        if current_index < len(self.task_order) - 1:
-            self.current_step = self.task_order[current_index + 1]
-            self.save_tasks()  # 状態を保存
-            return True
-        self.save_tasks()  # 完了時も保存
-        return False  # 全てのタスクが完了
-    
-    def get_all_tasks_status(self):
-        return {
-            "current_step": self.current_step,
-            "tasks": self.tasks,
-            "completion_rate": sum(1 for task in self.tasks.values() if task["completed"]) / len(self.tasks),
-            "metadata": self.task_metadata
-        }
-    
-    def reset_tasks(self):
-        """全タスクをリセット"""
-        for task in self.tasks.values():
-            task["completed"] = False
-        self.current_step = self.task_order[0] if self.task_order else "step1"
-        self.save_tasks()
-
 # グローバルインスタンス
 task_manager = TaskManager()
-llm_system = SimpleTaskJudgeSystem()
+scenario_catalog = ScenarioCatalog(Config.SCENARIO_DIR, cache_size=Config.SCENARIO_CACHE_SIZE)
+scenario_catalog.start_watcher(Config.SCENARIO_WATCH_INTERVAL)
+session_store = SessionStore(scenario_catalog, Config.DEFAULT_SCENARIO)
+judgment_jobs = JudgmentJobQueue(
+    handler=lambda payload: judge_environment_update(*payload),
+    workers=Config.JOB_WORKERS,
+    max_queue=Config.JOB_QUEUE_SIZE,
+    result_ttl=Config.JOB_RESULT_TTL
+)
+judgment_jobs.start()
+llm_system = RecordedJudgeSystem(Config.LLM_STUB_TRACE) if Config.LLM_STUB_TRACE else SimpleTaskJudgeSystem()
+traffic_recorder = TrafficRecorder(
+    Config.TRAFFIC_TRACE_FILE,
+    max_bytes=Config.TRAFFIC_TRACE_MAX_BYTES,
+    backup_count=Config.TRAFFIC_TRACE_BACKUP_COUNT
+) if Config.TRAFFIC_RECORDING else None
+
+def evict_session(session_id):
+    """無操作セッションの進行状況とキャッシュ済みの状態を破棄"""
+    session_store.evict(session_id)
+    ledger = getattr(getattr(llm_system, 'task_analyzer', None), 'ledger', None)
+    if ledger is not None:
+        ledger.reset_session(session_id)
+
+timer_wheel = TimerWheel(tick=Config.TIMER_WHEEL_TICK, slots=Config.TIMER_WHEEL_SLOTS)
+task_scheduler = TaskDeadlineScheduler(
+    timer_wheel,
+    task_timeout=Config.TASK_COMPLETION_TIMEOUT if Config.TASK_DEADLINES_ENABLED else 0,
+    auto_progression=Config.AUTO_TASK_PROGRESSION,
+    idle_timeout=Config.SESSION_IDLE_TIMEOUT,
+    on_evict=evict_session
+)
+timer_wheel.start()
+request_profiler = RequestProfiler()
+
+def request_session_id(data=None):
+    """X-Session-Id ヘッダー / session_id からセッションIDを取り出す（無ければ None）"""
+    data = data or {}
+    return request.headers.get('X-Session-Id') or data.get('session_id') or request.args.get('session_id')
+
+def request_scenario_id(data=None):
+    """X-Scenario-Id ヘッダー / scenario からシナリオIDを取り出す（無ければ None）"""
+    data = data or {}
+    return request.headers.get('X-Scenario-Id') or data.get('scenario') or request.args.get('scenario')
+
+def resolve_task_manager(data=None):
+    """
+    リクエストのセッションに対応するTaskManagerを返す
+    セッションID（X-Session-Id ヘッダー / session_id）が無い場合は従来の tasks.json を使う
+    """
+    return task_manager_for(request_session_id(data), request_scenario_id(data))
+
+def task_manager_for(session_id, scenario_id=None):
+    manager = session_store.get(session_id, scenario_id) if session_id else task_manager
+    task_scheduler.touch(session_id, manager)
+    return manager
+
+def is_admin_request():
+    """X-Admin-Token が PROFILER_ADMIN_TOKEN と一致するか（未設定なら常に拒否）"""
+    token = request.headers.get('X-Admin-Token', '')
+    # 非ASCIIのトークンでも例外にならないようバイト列で比較する
+    return bool(Config.PROFILER_ADMIN_TOKEN) and hmac.compare_digest(token.encode('utf-8'), Config.PROFILER_ADMIN_TOKEN.encode('utf-8'))
+
+@app.before_request
+def begin_profiling():
+    """プロファイル中、または X-Profile-Request ヘッダー付きの環境更新リクエストを計測"""
+    if request.endpoint != 'update_environment':
+        return
+    single = request.headers.get('X-Profile-Request') == '1' and is_admin_request()
+    g.profile_token = request_profiler.begin_request(single=single)
+
+@app.after_request
+def add_profile_header(response):
+    token = g.get('profile_token')
+    if token is not None and token["single"]:
+        response.headers['X-Profile-Id'] = token["session"]["capture_id"]
+    return response
+
+@app.teardown_request
+def end_profiling(exc):
+    request_profiler.end_request(g.pop('profile_token', None))
+
+def scenario_not_found_response(e):
+    return jsonify({
+        "success": False,
+        "error": str(e.args[0]),
+        "message": "Scenario not found",
+        "timestamp": datetime.now().isoformat()
+    }), 404
 
 @app.route('/')
 def health_check():
@@ -125,13 +131,15 @@ def health_check():
 @app.route('/api/current-task', methods=['GET'])
 def get_current_task():
     try:
-        task_data = task_manager.get_current_task()
+        task_data = resolve_task_manager().get_current_task()
         return jsonify({
             "success": True,
             "data": task_data,
             "message": "Current task retrieved successfully",
             "timestamp": datetime.now().isoformat()
         }), 200
+    except ScenarioNotFoundError as e:
+        return scenario_not_found_response(e)
     except Exception as e:
         return jsonify({
             "success": False,
@@ -143,13 +151,15 @@ def get_current_task():
 @app.route('/api/task-status', methods=['GET'])
 def get_task_status():
     try:
-        status_data = task_manager.get_all_tasks_status()
+        status_data = resolve_task_manager().get_all_tasks_status()
         return jsonify({
             "success": True,
             "data": status_data,
             "message": "Task status retrieved successfully",
             "timestamp": datetime.now().isoformat()
         }), 200
+    except ScenarioNotFoundError as e:
+        return scenario_not_found_response(e)
     except Exception as e:
         return jsonify({
             "success": False,
@@ -158,9 +168,160 @@ def get_task_status():
             "timestamp": datetime.now().isoformat()
         }), 500
 
+def judge_environment_update(data, manager, session_id=None, expected_step=None):
+    """
+    環境情報をLLMで判定し、完了していればタスクを進める（同期・非同期ジョブ共通）
+    expected_step: 観測を受け付けた時点のタスク。判定中に他のリクエストで進んでいたら進めない
+    """
+    if expected_step is None:
+        expected_step = manager.current_step
+    current_task = data.get('current_task', '')
+    player_status = data.get('player_status', '')
+    surroundings = data.get('surroundings', '')
+    
+    print(f"\n🎮 Unity環境更新:")
+    print(f"   タスク: {current_task}")
+    print(f"   状況: {player_status}")
+    
+    # 先読みモードでは現在のタスク以降の説明も渡し、どこまで完了したかを判定させる
+    lookahead = data.get('lookahead', Config.LOOKAHEAD_MODE)
+    upcoming_tasks = manager.get_upcoming_tasks(Config.LOOKAHEAD_STEPS) if lookahead else None
+    
+    # シンプルなタスク判定
+    result = llm_system.judge_task_status(
+        current_task=current_task,
+        player_status=player_status,
+        surroundings=surroundings,
+        task_pool=manager.get_task_pool(),
+        upcoming_tasks=upcoming_tasks,
+        session_id=session_id,
+        task_key=manager.current_step
+    )
+    
+    # タスク完了判定とNext Task追加
+    if result.get("data", {}).get('action') == 'next':
+        completed_through = result["data"].get('completed_through')
+        if completed_through:
+            # 完了した複数タスクを1回の遷移・1回の保存で進める
+            print(f"🎯 タスク完了判定: {completed_through} まで完了")
+            try:
+                has_next, completed_steps = manager.advance_through(completed_through, expected_step=expected_step)
+            except ValueError as e:
+                return invalid_judgment(result, e)
+            if not completed_steps:
+                return stale_judgment(result, expected_step)
+            result["data"]["completed_steps"] = completed_steps
+        else:
+            task_id = result.get("data", {}).get('task_id')
+            print(f"🎯 タスク完了判定: 次のタスク {task_id}")
+            has_next = manager.complete_current_task(expected_step=expected_step)
+            if has_next is None:
+                return stale_judgment(result, expected_step)
+        
+        if has_next:
+            next_task = manager.get_current_task()
+            result["data"]["next_task"] = next_task
+            if completed_through:
+                result["data"]["task_id"] = next_task["step"]
+            print(f"   → 次のタスク: {next_task['task']['description']}")
+        else:
+            result["data"]["all_completed"] = True
+            result["message"] = "All tasks completed!"
+            print("🎉 全タスク完了！")
+        
+        # 進んだタスクの期限を張り直す
+        task_scheduler.touch(session_id, manager)
+    
+    return result
+
+def keep_judgment(result):
+    """進めなかった判定を継続扱いに書き換える（完了位置は返さない）"""
+    result["data"]["action"] = "keep"
+    result["data"]["task_id"] = None
+    result["data"].pop("completed_through", None)
+    return result
+
+def stale_judgment(result, expected_step):
+    """判定中に他のリクエストがタスクを進めていた場合は二重に進めず継続扱いにする"""
+    print(f"   → {expected_step} は既に完了済みのため進めません")
+    keep_judgment(result)
+    result["data"]["stale"] = True
+    result["message"] = f"Task {expected_step} was already advanced by another update"
+    return result
+
+def invalid_judgment(result, error):
+    """LLMが現在より前・タスク順序に無いstepを答えた場合は進めず継続扱いにする"""
+    print(f"   → 判定されたstepが範囲外のため進めません: {error}")
+    keep_judgment(result)
+    result["message"] = f"Judgment ignored: {error}"
+    return result
+
+def is_async_request(data):
+    """?mode=async / Prefer: respond-async / "async": true のいずれかでジョブモード"""
+    return (
+        request.args.get('mode') == 'async'
+        or 'respond-async' in request.headers.get('Prefer', '')
+        or data.get('async') is True
+    )
+
+def dispatch_binary_frame(frame, send):
+    """バイナリプロトコルの観測フレームを判定ワーカーに渡し、完了したら同じ接続へ判定を返す"""
+    frame_id = frame.get("id")
+    
+    def reply(job):
+        if job["status"] == "done":
+            send(compact_decision(frame_id, job["result"]))
+        else:
+            send({"id": frame_id, "ok": False, "action": "keep", "task_id": None, "error": job["error"]})
+    
+    try:
+        session_id = frame.get("session")
+        manager = task_manager_for(session_id, frame.get("scenario"))
+        player_status, surroundings = observation_to_text(frame)
+        data = {
+            "current_task": frame.get("task", ""),
+            "player_status": player_status,
+            "surroundings": surroundings
+        }
+        if "lookahead" in frame:
+            data["lookahead"] = frame["lookahead"]
+        judgment_jobs.submit((data, manager, session_id, manager.current_step), on_done=reply)
+    except Exception as e:
+        # キュー満杯・未知のシナリオなどは即座にエラー判定を返す
+        send({"id": frame_id, "ok": False, "action": "keep", "task_id": None, "error": str(e)})
+
 @app.route('/api/environment-update', methods=['POST'])
 def update_environment():
     """Unity環境情報の更新とシンプルなタスク判定"""
+    arrived_at = time.time()
+    started = time.perf_counter()
+    record = None
+    if traffic_recorder is not None:
+        request_data = request.get_json(silent=True) or {}
+        # JSONがオブジェクトでない場合（配列など）はヘッダー・クエリのIDだけを使う（エラー応答は _update_environment に任せる）
+        body = request_data if isinstance(request_data, dict) else {}
+        session_id = request_session_id(body)
+        scenario_id = request_scenario_id(body)
+        
+        def record(result, status, mode="sync"):
+            traffic_recorder.record(
+                request_data=request_data,
+                session_id=session_id,
+                scenario_id=scenario_id,
+                result=result,
+                status=status,
+                latency_ms=(time.perf_counter() - started) * 1000,
+                mode=mode,
+                arrived_at=arrived_at
+            )
+    
+    response, status = _update_environment(record)
+    if record is not None and status != 202:
+        # ジョブとして受け付けたリクエストは判定が終わった時点でワーカーから記録する
+        record(response.get_json(silent=True) or {}, status)
+    return response, status
+
+def _update_environment(record=None):
     try:
         data = request.get_json()
         
@@ -172,38 +333,45 @@ def update_environment():
                 "timestamp": datetime.now().isoformat()
             }), 400
         
-        current_task = data.get('current_task', '')
-        player_status = data.get('player_status', '')
-        surroundings = data.get('surroundings', '')
-        
-        print(f"\n🎮 Unity環境更新:")
-        print(f"   タスク: {current_task}")
-        print(f"   状況: {player_status}")
+        manager = resolve_task_manager(data)
         
-        # シンプルなタスク判定
-        result = llm_system.judge_task_status(
-            current_task=current_task,
-            player_status=player_status,
-            surroundings=surroundings
-        )
-        
-        # タスク完了判定とNext Task追加
-        if result.get("data", {}).get('action') == 'next':
-            task_id = result.get("data", {}).get('task_id')
-            print(f"🎯 タスク完了判定: 次のタスク {task_id}")
-            has_next = task_manager.complete_current_task()
-            
-            if has_next:
-                next_task = task_manager.get_current_task()
-                result["data"]["next_task"] = next_task
-                print(f"   → 次のタスク: {next_task['task']['description']}")
-            else:
-                result["data"]["all_completed"] = True
-                result["message"] = "All tasks completed!"
-                print("🎉 全タスク完了！")
+        if is_async_request(data):
+            # ジョブとして受け付け、判定結果は /api/jobs/<job_id> で受け取る
+            on_done = None
+            if record is not None:
+                def on_done(job):
+                    if job["status"] == "done":
+                        record(job["result"], 200, mode="async")
+                    else:
+                        record({"data": {"action": "keep", "task_id": None}}, 500, mode="async")
+            job = judgment_jobs.submit((data, manager, request_session_id(data), manager.current_step), on_done=on_done)
+            return jsonify({
+                "success": True,
+                "data": {
+                    "job_id": job["job_id"],
+                    "status": job["status"],
+                    "poll_url": f"/api/jobs/{job['job_id']}"
+                },
+                "message": "Environment update accepted",
+                "timestamp": datetime.now().isoformat()
+            }), 202
         
+        result = judge_environment_update(data, manager, request_session_id(data))
         return jsonify(result), 200
         
+    except ScenarioNotFoundError as e:
+        return scenario_not_found_response(e)
+    except JobQueueFullError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "message": "Judgment queue is full, retry later",
+            "data": {
+                "action": "keep",
+                "task_id": None
+            },
+            "timestamp": datetime.now().isoformat()
+        }), 503
     except Exception as e:
         print(f"❌ 環境更新エラー: {e}")
         return jsonify({
@@ -217,12 +385,51 @@ def update_environment():
             "timestamp": datetime.now().isoformat()
         }), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """判定ジョブの状態と結果（?wait=秒 で完了までロングポーリング）"""
+    try:
+        wait = float(request.args.get('wait', 0))
+        if wait != wait:
+            raise ValueError("wait must be a number")
+        job = judgment_jobs.get(job_id, wait=min(wait, Config.JOB_LONG_POLL_MAX))
+        if job is None:
+            return jsonify({
+                "success": False,
+                "error": f"Unknown or expired job: {job_id}",
+                "message": "Job not found",
+                "timestamp": datetime.now().isoformat()
+            }), 404
+        
+        return jsonify({
+            "success": True,
+            "data": job,
+            "message": f"Job {job['status']}",
+            "timestamp": datetime.now().isoformat()
+        }), 200
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "message": "Invalid wait parameter",
+            "timestamp": datetime.now().isoformat()
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "message": "Failed to retrieve job",
+            "timestamp": datetime.now().isoformat()
+        }), 500
+
 @app.route('/api/force-complete-task', methods=['POST'])
 def force_complete_task():
     """現在のタスクを強制完了"""
     try:
-        has_next = task_manager.complete_current_task()
-        current_task = task_manager.get_current_task()
+        manager = resolve_task_manager(request.get_json(silent=True))
+        has_next = manager.complete_current_task()
+        task_scheduler.touch(request_session_id(request.get_json(silent=True)), manager)
+        current_task = manager.get_current_task()
         
         return jsonify({
             "success": True,
@@ -233,6 +440,8 @@ def force_complete_task():
             "message": "Task completed successfully",
             "timestamp": datetime.now().isoformat()
         }), 200
+    except ScenarioNotFoundError as e:
+        return scenario_not_found_response(e)
     except Exception as e:
         return jsonify({
             "success": False,
@@ -245,8 +454,12 @@ def force_complete_task():
 def reset_tasks():
     """全タスクをリセット"""
     try:
-        task_manager.reset_tasks()
-        current_task = task_manager.get_current_task()
+        data = request.get_json(silent=True)
+        manager = resolve_task_manager(data)
+        # トークン予算はタスクをリセットしても戻さない（無操作で破棄されたときだけ0に戻る）
+        manager.reset_tasks()
+        task_scheduler.touch(request_session_id(data), manager)
+        current_task = manager.get_current_task()
         
         return jsonify({
             "success": True,
@@ -256,6 +469,8 @@ def reset_tasks():
             "message": "All tasks have been reset successfully",
             "timestamp": datetime.now().isoformat()
         }), 200
+    except ScenarioNotFoundError as e:
+        return scenario_not_found_response(e)
     except Exception as e:
         return jsonify({
             "success": False,
@@ -264,6 +479,142 @@ def reset_tasks():
             "timestamp": datetime.now().isoformat()
         }), 500
 
+@app.route('/api/admin/profile', methods=['POST'])
+def run_profile():
+    """
+    稼働中の環境更新リクエストを指定秒数プロファイルし、結果を返す（要 X-Admin-Token）
+    mode=sample: collapsed stack / mode=cprofile: pstats テキスト（format=raw でバイナリ）
+    """
+    if not is_admin_request():
+        return jsonify({
+            "success": False,
+            "error": "Invalid or missing admin token",
+            "message": "Profiling is not allowed",
+            "timestamp": datetime.now().isoformat()
+        }), 403
+    try:
+        params = request.get_json(silent=True) or request.args
+        mode = params.get('mode', 'sample')
+        duration = max(0.0, min(float(params.get('duration', 10)), Config.PROFILER_MAX_DURATION))
+        capture = request_profiler.run_session(mode, duration, interval=Config.PROFILER_SAMPLE_INTERVAL)
+        body, content_type = render_capture(capture, params.get('format', ''))
+        return body, 200, {
+            'Content-Type': content_type,
+            'X-Profile-Id': capture["capture_id"],
+            'X-Profile-Requests': str(capture["requests"])
+        }
+    except ProfilerBusyError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "message": "Profiler is busy",
+            "timestamp": datetime.now().isoformat()
+        }), 409
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "message": "Invalid profiling parameters",
+            "timestamp": datetime.now().isoformat()
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "message": "Failed to run profiler",
+            "timestamp": datetime.now().isoformat()
+        }), 500
+
+@app.route('/api/admin/profile/<capture_id>', methods=['GET'])
+def get_profile(capture_id):
+    """取得済みのプロファイル結果（X-Profile-Id で返されたID）を返す（要 X-Admin-Token）"""
+    if not is_admin_request():
+        return jsonify({
+            "success": False,
+            "error": "Invalid or missing admin token",
+            "message": "Profiling is not allowed",
+            "timestamp": datetime.now().isoformat()
+        }), 403
+    capture = request_profiler.get_capture(capture_id)
+    if capture is None:
+        return jsonify({
+            "success": False,
+            "error": f"Unknown or expired profile: {capture_id}",
+            "message": "Profile not found",
+            "timestamp": datetime.now().isoformat()
+        }), 404
+    body, content_type = render_capture(capture, request.args.get('format', ''))
+    return body, 200, {'Content-Type': content_type}
+
+@app.route('/api/task-events', methods=['GET'])
+def get_task_events():
+    """タスク期限切れ・セッション破棄などの最近のイベント（session_id で絞り込み可）"""
+    try:
+        return jsonify({
+            "success": True,
+            "data": {
+                "events": task_scheduler.recent_events(request.args.get('session_id')),
+                "active_timers": len(timer_wheel)
+            },
+            "message": "Task events retrieved successfully",
+            "timestamp": datetime.now().isoformat()
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "message": "Failed to retrieve task events",
+            "timestamp": datetime.now().isoformat()
+        }), 500
+
+@app.route('/api/token-usage', methods=['GET'])
+def get_token_usage():
+    """セッション・タスク・モデル別のトークン使用量"""
+    try:
+        ledger = getattr(getattr(llm_system, 'task_analyzer', None), 'ledger', None)
+        if ledger is None:
+            return jsonify({
+                "success": False,
+                "error": "Token ledger is not available",
+                "message": "LLM stub is active",
+                "timestamp": datetime.now().isoformat()
+            }), 404
+        
+        return jsonify({
+            "success": True,
+            "data": ledger.snapshot(),
+            "message": "Token usage retrieved successfully",
+            "timestamp": datetime.now().isoformat()
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "message": "Failed to retrieve token usage",
+            "timestamp": datetime.now().isoformat()
+        }), 500
+
+@app.route('/api/scenarios', methods=['GET'])
+def list_scenarios():
+    """シナリオカタログの一覧（読み込み済みかどうかも返す）"""
+    try:
+        return jsonify({
+            "success": True,
+            "data": {
+                "default_scenario": Config.DEFAULT_SCENARIO,
+                "scenarios": scenario_catalog.list_scenarios()
+            },
+            "message": "Scenarios retrieved successfully",
+            "timestamp": datetime.now().isoformat()
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "message": "Failed to retrieve scenarios",
+            "timestamp": datetime.now().isoformat()
+        }), 500
+
 if __name__ == '__main__':
     print("🚀 Unity Task Management Server 起動中...")
     print(f"🔧 LLMモデル: {Config.LLM_MODEL}")
@@ -279,6 +630,11 @@ if __name__ == '__main__':
         for error in config_errors:
             print(f"   - {error}")
     
+    # Flaskのリローダー親プロセスではポートを確保しない
+    if Config.BINARY_PROTOCOL_ENABLED and (not Config.DEBUG_MODE or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        BinaryTelemetryServer(Config.UNITY_SERVER_HOST, Config.BINARY_PROTOCOL_PORT, dispatch_binary_frame).start()
+        print(f"📡 バイナリプロトコル: {Config.UNITY_SERVER_HOST}:{Config.BINARY_PROTOCOL_PORT}")
+    
     app.run(
         host=Config.UNITY_SERVER_HOST,
         port=Config.UNITY_SERVER_PORT,
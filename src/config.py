@@ -13,6 +13,9 @@ class Config:
     # Unity通信設定
     UNITY_SERVER_HOST = os.getenv('UNITY_SERVER_HOST', '0.0.0.0')
     UNITY_SERVER_PORT = int(os.getenv('UNITY_SERVER_PORT', 5000))
+    # 高頻度テレメトリ用バイナリプロトコル（TCP + MessagePack）
+    BINARY_PROTOCOL_ENABLED = os.getenv('BINARY_PROTOCOL_ENABLED', 'false').lower() == 'true'
+    BINARY_PROTOCOL_PORT = int(os.getenv('BINARY_PROTOCOL_PORT', 5001))
     
     # デバッグモード
     DEBUG_MODE = os.getenv('DEBUG_MODE', 'true').lower() == 'true'
@@ -22,9 +25,53 @@ class Config:
     LLM_MAX_TOKENS = int(os.getenv('LLM_MAX_TOKENS', 500))
     LLM_TEMPERATURE = float(os.getenv('LLM_TEMPERATURE', 0.0))
     
+    # トークン台帳・予算設定
+    TOKEN_LEDGER_FILE = os.getenv('TOKEN_LEDGER_FILE', 'logs/token_ledger.json')
+    TOKEN_LEDGER_FLUSH_INTERVAL = float(os.getenv('TOKEN_LEDGER_FLUSH_INTERVAL', 30))  # 秒
+    SESSION_TOKEN_BUDGET = int(os.getenv('SESSION_TOKEN_BUDGET', 0))  # 0で無制限
+    # 予算超過後: 小さいモデル + デバウンス、予算×この倍率を超えたらさらに長いデバウンス
+    # （セッションIDなしのリクエストは予算の対象外。使用量は起動ごと・リセット/破棄時に0へ戻る）
+    DEGRADED_LLM_MODEL = os.getenv('DEGRADED_LLM_MODEL', 'gpt-4o-mini')
+    DEGRADED_DEBOUNCE_SECONDS = float(os.getenv('DEGRADED_DEBOUNCE_SECONDS', 5))
+    MINIMAL_BUDGET_RATIO = float(os.getenv('MINIMAL_BUDGET_RATIO', 1.5))
+    MINIMAL_DEBOUNCE_SECONDS = float(os.getenv('MINIMAL_DEBOUNCE_SECONDS', 30))
+    
     # タスク設定
     TASK_COMPLETION_TIMEOUT = int(os.getenv('TASK_COMPLETION_TIMEOUT', 30))
     AUTO_TASK_PROGRESSION = os.getenv('AUTO_TASK_PROGRESSION', 'true').lower() == 'true'
+    # タスク期限（TASK_COMPLETION_TIMEOUT秒）の監視。有効時、期限切れで AUTO_TASK_PROGRESSION に従い自動進行
+    TASK_DEADLINES_ENABLED = os.getenv('TASK_DEADLINES_ENABLED', 'false').lower() == 'true'
+    SESSION_IDLE_TIMEOUT = float(os.getenv('SESSION_IDLE_TIMEOUT', 1800))  # 秒、0で破棄しない
+    TIMER_WHEEL_TICK = float(os.getenv('TIMER_WHEEL_TICK', 0.1))  # 秒
+    TIMER_WHEEL_SLOTS = int(os.getenv('TIMER_WHEEL_SLOTS', 512))
+    # 先読み判定（現在のタスク以降もまとめて判定し、複数タスクを一度に進める）
+    LOOKAHEAD_MODE = os.getenv('LOOKAHEAD_MODE', 'false').lower() == 'true'
+    LOOKAHEAD_STEPS = int(os.getenv('LOOKAHEAD_STEPS', 3))
+    
+    # シナリオカタログ設定（セッションごとにシナリオを選択）
+    SCENARIO_DIR = os.getenv('SCENARIO_DIR', 'tasks/scenarios')
+    DEFAULT_SCENARIO = os.getenv('DEFAULT_SCENARIO', 'zoom_meeting')
+    SCENARIO_CACHE_SIZE = int(os.getenv('SCENARIO_CACHE_SIZE', 8))
+    SCENARIO_WATCH_INTERVAL = float(os.getenv('SCENARIO_WATCH_INTERVAL', 2.0))  # 0で監視しない
+    
+    # 非同期判定ジョブ設定
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))
+    JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', 100))
+    JOB_RESULT_TTL = float(os.getenv('JOB_RESULT_TTL', 300))  # 秒
+    JOB_LONG_POLL_MAX = float(os.getenv('JOB_LONG_POLL_MAX', 30))  # 秒
+    
+    # オンデマンドプロファイラ（X-Admin-Token で保護、未設定なら無効）
+    PROFILER_ADMIN_TOKEN = os.getenv('PROFILER_ADMIN_TOKEN', '')
+    PROFILER_MAX_DURATION = float(os.getenv('PROFILER_MAX_DURATION', 60))  # 秒
+    PROFILER_SAMPLE_INTERVAL = float(os.getenv('PROFILER_SAMPLE_INTERVAL', 0.005))  # 秒
+    
+    # トラフィック記録設定（/api/environment-update の再現用）
+    TRAFFIC_RECORDING = os.getenv('TRAFFIC_RECORDING', 'false').lower() == 'true'
+    TRAFFIC_TRACE_FILE = os.getenv('TRAFFIC_TRACE_FILE', 'traces/environment_updates.jsonl')
+    TRAFFIC_TRACE_MAX_BYTES = int(os.getenv('TRAFFIC_TRACE_MAX_BYTES', 5 * 1024 * 1024))
+    TRAFFIC_TRACE_BACKUP_COUNT = int(os.getenv('TRAFFIC_TRACE_BACKUP_COUNT', 3))
+    # 記録済み判定で応答するスタブLLM（再生時に指定）
+    LLM_STUB_TRACE = os.getenv('LLM_STUB_TRACE', '')
     
     @classmethod
     def validate_config(cls):
@@ -37,6 +84,30 @@ class Config:
         if cls.UNITY_SERVER_PORT < 1 or cls.UNITY_SERVER_PORT > 65535:
             errors.append("UNITY_SERVER_PORT は1-65535の範囲で設定してください")
         
+        if cls.BINARY_PROTOCOL_ENABLED and (cls.BINARY_PROTOCOL_PORT < 1 or cls.BINARY_PROTOCOL_PORT > 65535 or cls.BINARY_PROTOCOL_PORT == cls.UNITY_SERVER_PORT):
+            errors.append("BINARY_PROTOCOL_PORT は1-65535の範囲で、UNITY_SERVER_PORT と異なる値を設定してください")
+        
+        if cls.SCENARIO_CACHE_SIZE < 1:
+            errors.append("SCENARIO_CACHE_SIZE は1以上で設定してください")
+        
+        if cls.TIMER_WHEEL_TICK <= 0 or cls.TIMER_WHEEL_SLOTS < 1:
+            errors.append("TIMER_WHEEL_TICK は正の値、TIMER_WHEEL_SLOTS は1以上で設定してください")
+        
+        if cls.SESSION_TOKEN_BUDGET < 0 or cls.MINIMAL_BUDGET_RATIO < 1:
+            errors.append("SESSION_TOKEN_BUDGET は0以上、MINIMAL_BUDGET_RATIO は1以上で設定してください")
+        
+        if cls.LOOKAHEAD_STEPS < 1:
+            errors.append("LOOKAHEAD_STEPS は1以上で設定してください")
+        
+        if cls.JOB_WORKERS < 1 or cls.JOB_QUEUE_SIZE < 1:
+            errors.append("JOB_WORKERS と JOB_QUEUE_SIZE は1以上で設定してください")
+        
+        if cls.PROFILER_MAX_DURATION <= 0 or cls.PROFILER_SAMPLE_INTERVAL <= 0:
+            errors.append("PROFILER_MAX_DURATION と PROFILER_SAMPLE_INTERVAL は正の値で設定してください")
+        
+        if cls.TRAFFIC_TRACE_MAX_BYTES < 0 or cls.TRAFFIC_TRACE_BACKUP_COUNT < 0:
+            errors.append("TRAFFIC_TRACE_MAX_BYTES と TRAFFIC_TRACE_BACKUP_COUNT は0以上で設定してください")
+        
         return errors
     
     @classmethod
@@ -45,7 +116,16 @@ class Config:
         print("=== Unity Task Management System Configuration ===")
         print(f"Server: {cls.UNITY_SERVER_HOST}:{cls.UNITY_SERVER_PORT}")
         print(f"Debug Mode: {cls.DEBUG_MODE}")
+        print(f"Binary Protocol: {f'port {cls.BINARY_PROTOCOL_PORT}' if cls.BINARY_PROTOCOL_ENABLED else '無効'}")
         print(f"LLM Model: {cls.LLM_MODEL}")
+        print(f"Session Token Budget: {cls.SESSION_TOKEN_BUDGET or '無制限'}")
         print(f"OpenAI API Key: {'設定済み' if cls.OPENAI_API_KEY else '未設定'}")
-        print(f"Task Completion Timeout: {cls.TASK_COMPLETION_TIMEOUT}秒")
+        print(f"Task Completion Timeout: {cls.TASK_COMPLETION_TIMEOUT}秒 ({'監視中' if cls.TASK_DEADLINES_ENABLED else '無効'}, 自動進行: {cls.AUTO_TASK_PROGRESSION})")
+        print(f"Session Idle Timeout: {cls.SESSION_IDLE_TIMEOUT or '無効'}")
+        print(f"Scenario Catalog: {cls.SCENARIO_DIR} (default: {cls.DEFAULT_SCENARIO})")
+        print(f"Judgment Jobs: {cls.JOB_WORKERS} workers, queue {cls.JOB_QUEUE_SIZE}")
+        print(f"Traffic Recording: {cls.TRAFFIC_TRACE_FILE if cls.TRAFFIC_RECORDING else '無効'}")
+        print(f"Profiler: {'有効' if cls.PROFILER_ADMIN_TOKEN else '無効'}")
+        if cls.LLM_STUB_TRACE:
+            print(f"LLM Stub Trace: {cls.LLM_STUB_TRACE}")
         print("=" * 50) 
\ No newline at end of file
@@ -0,0 +1,233 @@
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+from utils.scenario_catalog import ScenarioCatalog, Scenario
+
+
+class TaskManager:
+    def __init__(self, tasks_file='tasks/tasks.json', scenario: Optional[Scenario] = None):
+        """
+        tasks_file: タスク状態の保存先（None の場合は保存しないメモリ上のセッション）
+        scenario: カタログから読み込んだシナリオ（指定時は tasks_file を読まずにこちらを使う）
+        """
+        self.tasks_file = tasks_file
+        self.scenario = None
+        self._lock = threading.RLock()
+        if scenario is not None:
+            self.apply_scenario(scenario)
+        else:
+            self.load_tasks()
+
+    def load_tasks(self):
+        """JSONファイルからタスクデータを読み込み"""
+        try:
+            with open(self.tasks_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                self.task_metadata = data.get('task_metadata', {})
+                self.tasks = data.get('tasks', {})
+                self.task_order = data.get('task_order', [])
+                self.current_step = data.get('current_step', self.task_order[0] if self.task_order else "step1")
+                print(f"✓ タスクデータを読み込みました: {len(self.tasks)}個のタスク")
+        except FileNotFoundError:
+            print(f"⚠️ {self.tasks_file} が見つかりません。デフォルトタスクを使用します。")
+            self._create_default_tasks()
+        except json.JSONDecodeError as e:
+            print(f"⚠️ {self.tasks_file} の読み込みエラー: {e}")
+            self._create_default_tasks()
+
+    def apply_scenario(self, scenario: Scenario):
+        """シナリオ定義を適用（再読み込み時は同じstep IDの完了状態を引き継ぐ）"""
+        with self._lock:
+            previous = getattr(self, 'tasks', {})
+            tasks = scenario.copy_tasks()
+            for step_id, task in tasks.items():
+                if step_id in previous:
+                    task["completed"] = previous[step_id].get("completed", False)
+
+            current_step = getattr(self, 'current_step', scenario.current_step)
+            if current_step not in scenario.task_order:
+                current_step = next(
+                    (step_id for step_id in scenario.task_order if not tasks[step_id].get("completed")),
+                    scenario.task_order[-1] if scenario.task_order else "step1"
+                )
+
+            self.task_metadata = scenario.task_metadata
+            self.tasks = tasks
+            self.task_order = list(scenario.task_order)
+            self.current_step = current_step
+            self.scenario = scenario
+
+    def _create_default_tasks(self):
+        """デフォルトタスクを作成（フォールバック）"""
+        self.task_metadata = {
+            "title": "研究室Zoom会議準備タスク",
+            "total_steps": 7
+        }
+        self.tasks = {
+            "step1": {"description": "中会議室のカギを開ける", "completed": False},
+            "step2": {"description": "MacBookと充電器とUSBポートを用意する", "completed": False},
+            "step3": {"description": "みんながPCを充電する用の延長ケーブルをつなぐ", "completed": False},
+            "step4": {"description": "Macで研究室Zoomにつなぐ", "completed": False},
+            "step5": {"description": "Owlカメラとyamahaのマイクとスクリーンつける", "completed": False},
+            "step6": {"description": "こいつらをUSBポート介してUSBとHDMIでMacにつなぐ", "completed": False},
+            "step7": {"description": "Zoomのカメラ＆マイクON", "completed": False}
+        }
+        self.task_order = ["step1", "step2", "step3", "step4", "step5", "step6", "step7"]
+        self.current_step = "step1"
+
+    def save_tasks(self):
+        """現在のタスク状態をJSONファイルに保存"""
+        if self.tasks_file is None:
+            return
+        try:
+            # ディレクトリが存在しない場合は作成
+            os.makedirs(os.path.dirname(self.tasks_file), exist_ok=True)
+
+            data = {
+                "task_metadata": self.task_metadata,
+                "tasks": self.tasks,
+                "task_order": self.task_order,
+                "current_step": self.current_step
+            }
+            with open(self.tasks_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            print("✓ タスク状態を保存しました")
+        except Exception as e:
+            print(f"⚠️ タスク保存エラー: {e}")
+
+    def get_current_task(self):
+        with self._lock:
+            current_task_data = self.tasks.get(self.current_step, {})
+            return {
+                "step": self.current_step,
+                "task": current_task_data,
+                "progress": f"{self.task_order.index(self.current_step) + 1}/{len(self.task_order)}",
+                "metadata": self.task_metadata
+            }
+
+    def complete_current_task(self, expected_step=None):
+        """
+        現在のタスクを完了にして次へ進める
+        expected_step を渡した場合、判定開始後に他のリクエストで進んでいれば何もせず None を返す
+        """
+        with self._lock:
+            if expected_step is not None and expected_step != self.current_step:
+                return None
+            self.tasks[self.current_step]["completed"] = True
+            current_index = self.task_order.index(self.current_step)
+            if current_index < len(self.task_order) - 1:
+                self.current_step = self.task_order[current_index + 1]
+                self.save_tasks()  # 状態を保存
+                return True
+            self.save_tasks()  # 完了時も保存
+            return False  # 全てのタスクが完了
+
+    def advance_through(self, step_id, expected_step=None):
+        """
+        現在のタスクから step_id までをまとめて完了にし、保存は1回だけ行う
+        expected_step を渡した場合、判定開始後に他のリクエストで進んでいれば何もしない
+
+        Returns:
+            (次のタスクがあるか, 今回完了にしたstep IDのリスト)
+
+        Raises:
+            ValueError: step_id がタスク順序に無い、または（expected_step が現在のタスクと一致するのに）現在より前のstep
+        """
+        with self._lock:
+            current_index = self.task_order.index(self.current_step)
+            if expected_step is not None and expected_step != self.current_step:
+                # 判定中に他のリクエストで進んでいた場合は何もしない
+                return current_index < len(self.task_order) - 1, []
+            if step_id not in self.task_order:
+                raise ValueError(f"Unknown step: {step_id}")
+            target_index = self.task_order.index(step_id)
+            if target_index < current_index:
+                if expected_step is not None:
+                    raise ValueError(f"Step {step_id} is behind the current step {self.current_step}")
+                # 既に進んでいる（同時リクエストなど）場合は何もしない
+                return current_index < len(self.task_order) - 1, []
+
+            completed_steps = self.task_order[current_index:target_index + 1]
+            for completed_step in completed_steps:
+                self.tasks[completed_step]["completed"] = True
+            has_next = target_index < len(self.task_order) - 1
+            if has_next:
+                self.current_step = self.task_order[target_index + 1]
+            else:
+                self.current_step = self.task_order[-1]
+            self.save_tasks()
+            return has_next, completed_steps
+
+    def get_upcoming_tasks(self, limit):
+        """現在のタスクから順に最大 limit 件の (step ID, 説明) を返す"""
+        with self._lock:
+            current_index = self.task_order.index(self.current_step)
+            return [
+                (step_id, self.tasks[step_id].get("description", ""))
+                for step_id in self.task_order[current_index:current_index + limit]
+            ]
+
+    def get_task_pool(self):
+        """LLMに渡すタスクプール（step ID と説明）"""
+        with self._lock:
+            return [f"{step_id}: {self.tasks[step_id].get('description', '')}" for step_id in self.task_order]
+
+    def get_all_tasks_status(self):
+        with self._lock:
+            return {
+                "current_step": self.current_step,
+                "tasks": self.tasks,
+                "completion_rate": sum(1 for task in self.tasks.values() if task["completed"]) / len(self.tasks),
+                "metadata": self.task_metadata
+            }
+
+    def reset_tasks(self):
+        """全タスクをリセット"""
+        with self._lock:
+            for task in self.tasks.values():
+                task["completed"] = False
+            self.current_step = self.task_order[0] if self.task_order else "step1"
+            self.save_tasks()
+
+
+class SessionStore:
+    """セッションごとに選択されたシナリオとタスク進行状況（メモリ上）を保持"""
+
+    def __init__(self, catalog: ScenarioCatalog, default_scenario: str):
+        self.catalog = catalog
+        self.default_scenario = default_scenario
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, scenario_id: Optional[str] = None) -> TaskManager:
+        """
+        セッションのTaskManagerを返す
+        scenario_id が指定され、現在と異なる場合はそのシナリオで進行状況を作り直す
+        """
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None or (scenario_id and scenario_id != session["scenario_id"]):
+                scenario_id = scenario_id or self.default_scenario
+                scenario = self.catalog.get(scenario_id)
+                session = {
+                    "scenario_id": scenario_id,
+                    "task_manager": TaskManager(tasks_file=None, scenario=scenario),
+                    "created_at": datetime.now().isoformat()
+                }
+                self.sessions[session_id] = session
+                print(f"✓ セッション開始: {session_id} (シナリオ: {scenario_id})")
+                return session["task_manager"]
+
+        # シナリオが再読み込みされていれば、処理中のリクエストを止めずに新しい定義へ移行する
+        manager = session["task_manager"]
+        scenario = self.catalog.get(session["scenario_id"])
+        if manager.scenario.digest != scenario.digest:
+            manager.apply_scenario(scenario)
+        return manager
+
+    def evict(self, session_id: str) -> bool:
+        """セッションの進行状況を破棄（無操作セッションの掃除用）"""
+        with self._lock:
+            return self.sessions.pop(session_id, None) is not None
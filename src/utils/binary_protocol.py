@@ -0,0 +1,150 @@
+"""
+Unity Task Management - 高頻度テレメトリ用バイナリプロトコル
+常時接続のTCP上で、4バイト長（ビッグエンディアン）+ MessagePack のフレームを送受信する
+
+観測フレーム（Unity → サーバー）:
+    {"id": 連番, "task": 現在のタスク, "flags": {"door_unlocked": true, ...},
+     "pos": {"player": [x, y, z], ...}, "status": 任意の補足, "surroundings": 任意の補足,
+     "session": セッションID, "scenario": シナリオID, "lookahead": bool}
+
+判定フレーム（サーバー → Unity、同じ接続で判定完了順に返す）:
+    {"id": 観測フレームのid, "ok": true, "action": "keep" | "next", "task_id": ..., "next_step": ...}
+"""
+
+import socket
+import socketserver
+import struct
+import threading
+from typing import Dict, Any, Callable, Optional, Tuple
+
+import msgpack
+
+HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 1024 * 1024
+
+
+class FrameError(Exception):
+    """フレームが壊れている、または大きすぎる"""
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    body = msgpack.packb(message, use_bin_type=True)
+    return HEADER.pack(len(body)) + body
+
+
+def read_frame(stream) -> Optional[Dict[str, Any]]:
+    """ストリームから1フレーム読み込む（接続が閉じられたら None）"""
+    header = stream.read(HEADER.size)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        raise FrameError("Truncated frame header")
+    (length,) = HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame too large: {length} bytes")
+    body = stream.read(length)
+    if len(body) < length:
+        raise FrameError("Truncated frame body")
+    message = msgpack.unpackb(body, raw=False)
+    if not isinstance(message, dict):
+        raise FrameError("Frame must be a map")
+    return message
+
+
+def observation_to_text(frame: Dict[str, Any]) -> Tuple[str, str]:
+    """構造化された観測を既存の判定パイプライン用の (player_status, surroundings) に変換"""
+    status_lines = [frame["status"]] if frame.get("status") else []
+    for name, value in (frame.get("flags") or {}).items():
+        status_lines.append(f"{name}: {'true' if value else 'false'}")
+
+    surroundings_lines = [frame["surroundings"]] if frame.get("surroundings") else []
+    for name, position in (frame.get("pos") or {}).items():
+        surroundings_lines.append(f"{name}: ({', '.join(f'{float(v):.2f}' for v in position)})")
+
+    return "\n".join(status_lines), "\n".join(surroundings_lines)
+
+
+def compact_decision(frame_id: Any, result: Dict[str, Any]) -> Dict[str, Any]:
+    """判定結果から判定フレームに必要な項目だけを取り出す"""
+    data = result.get("data") or {}
+    decision = {
+        "id": frame_id,
+        "ok": bool(result.get("success")),
+        "action": data.get("action", "keep"),
+        "task_id": data.get("task_id"),
+    }
+    if data.get("next_task"):
+        decision["next_step"] = data["next_task"]["step"]
+    for key in ("all_completed", "completed_steps", "degraded"):
+        if data.get(key):
+            decision[key] = data[key]
+    return decision
+
+
+class _ConnectionHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        write_lock = threading.Lock()
+
+        def send(message: Dict[str, Any]):
+            with write_lock:
+                self.wfile.write(encode_frame(message))
+                self.wfile.flush()
+
+        peer = f"{self.client_address[0]}:{self.client_address[1]}"
+        print(f"🔌 バイナリ接続: {peer}")
+        try:
+            while True:
+                frame = read_frame(self.rfile)
+                if frame is None:
+                    break
+                self.server.dispatch(frame, send)
+        except (FrameError, ValueError) as e:
+            print(f"⚠️ 不正なフレーム ({peer}): {e}")
+        except (ConnectionError, OSError):
+            pass
+        print(f"🔌 バイナリ切断: {peer}")
+
+
+class BinaryTelemetryServer(socketserver.ThreadingTCPServer):
+    """
+    接続ごとにフレームを読み、dispatch(frame, send) に渡す
+    dispatch は判定完了時に send(判定フレーム) を呼ぶ（別スレッドからでもよい）
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str, port: int, dispatch: Callable[[Dict[str, Any], Callable], None]):
+        self.dispatch = dispatch
+        super().__init__((host, port), _ConnectionHandler)
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name="binary-telemetry", daemon=True)
+        thread.start()
+        return thread
+
+
+class BinaryTelemetryClient:
+    """ベンチマーク・動作確認用の同期クライアント"""
+
+    def __init__(self, host: str = "localhost", port: int = 5001):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stream = self.sock.makefile("rb")
+        self._next_id = 0
+
+    def send(self, observation: Dict[str, Any]) -> int:
+        self._next_id += 1
+        self.sock.sendall(encode_frame({**observation, "id": self._next_id}))
+        return self._next_id
+
+    def receive(self) -> Optional[Dict[str, Any]]:
+        return read_frame(self.stream)
+
+    def request(self, observation: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        self.send(observation)
+        return self.receive()
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
@@ -0,0 +1,143 @@
+"""
+Unity Task Management - 非同期判定ジョブキュー
+環境更新をキューに積んで即座にジョブIDを返し、ワーカースレッドでLLM判定を行う
+"""
+
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional
+
+
+class JobQueueFullError(Exception):
+    """キューが上限に達しており、ジョブを受け付けられない"""
+
+
+class JudgmentJobQueue:
+    """上限付きキュー + ワーカープール + 期限付きジョブ結果"""
+
+    def __init__(self, handler: Callable[[Any], Dict[str, Any]], workers: int = 4, max_queue: int = 100, result_ttl: float = 300):
+        self.handler = handler
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=max_queue)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._payloads: Dict[str, Any] = {}
+        self._callbacks: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._cond = threading.Condition()
+        self._threads = []
+        self._last_sweep = 0.0
+
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"judgment-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, payload: Any, on_done: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        ジョブを登録して状態を返す（満杯なら JobQueueFullError）
+        on_done を渡すと、完了時にワーカースレッドからジョブの状態を引数に呼ばれる
+        """
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "result": None,
+            "error": None,
+            "created_at": datetime.now().isoformat(),
+            "finished_at": None,
+        }
+        with self._cond:
+            self._sweep()
+            self._jobs[job_id] = job
+            self._payloads[job_id] = payload
+            if on_done is not None:
+                self._callbacks[job_id] = on_done
+            # 結果の保持期限はジョブが終わってから数える（キュー待ちのジョブは消さない）
+            job["_expires"] = float("inf")
+        try:
+            self._queue.put_nowait(job_id)
+        except queue.Full:
+            with self._cond:
+                self._jobs.pop(job_id, None)
+                self._payloads.pop(job_id, None)
+                self._callbacks.pop(job_id, None)
+            raise JobQueueFullError(f"Job queue is full ({self._queue.maxsize} jobs)")
+        return self._public(job)
+
+    def get(self, job_id: str, wait: float = 0) -> Optional[Dict[str, Any]]:
+        """ジョブの状態を返す。wait > 0 なら完了するまで最大 wait 秒待つ（ロングポーリング）"""
+        deadline = time.monotonic() + max(0.0, wait)
+        with self._cond:
+            self._sweep()
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None
+                remaining = deadline - time.monotonic()
+                if job["status"] in ("done", "failed") or remaining <= 0:
+                    return self._public(job)
+                self._cond.wait(remaining)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return counts
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            with self._cond:
+                job = self._jobs.get(job_id)
+                payload = self._payloads.pop(job_id, None)
+                on_done = self._callbacks.pop(job_id, None)
+                if job is None:
+                    # 登録が取り消されたジョブ（念のため）
+                    continue
+                job["status"] = "running"
+
+            try:
+                result = self.handler(payload)
+                status, error = "done", None
+            except Exception as e:
+                print(f"❌ ジョブ実行エラー ({job_id}): {e}")
+                result, status, error = None, "failed", str(e)
+
+            with self._cond:
+                job["status"] = status
+                job["result"] = result
+                job["error"] = error
+                job["finished_at"] = datetime.now().isoformat()
+                job["_expires"] = time.monotonic() + self.result_ttl
+                self._cond.notify_all()
+                public = self._public(job)
+
+            if on_done is not None:
+                try:
+                    on_done(public)
+                except Exception as e:
+                    print(f"⚠️ ジョブ完了通知エラー ({job_id}): {e}")
+
+    def _sweep(self):
+        """結果の保持期限が切れた完了済みジョブを削除（_cond を保持した状態で呼ぶ、最大1秒に1回）"""
+        now = time.monotonic()
+        if now - self._last_sweep < 1.0:
+            return
+        self._last_sweep = now
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job["_expires"] <= now and job["status"] in ("done", "failed")]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._payloads.pop(job_id, None)
+            self._callbacks.pop(job_id, None)
+
+    @staticmethod
+    def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in job.items() if not key.startswith("_")}
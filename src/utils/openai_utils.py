@@ -4,6 +4,7 @@ Unity Task Management - LLMタスク判定システム
 """
 
 from openai import OpenAI
+import atexit
 import json
 import os
 from datetime import datetime
@@ -17,6 +18,7 @@ try:
 except ImportError:
     sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
     from config import Config
+from utils.token_ledger import TokenLedger, DEGRADE_NONE, DEGRADE_MINIMAL
 
 class TaskProgressAnalyzer:
     """LLM: タスク進捗状況を分析・判定"""
@@ -31,15 +33,51 @@ class TaskProgressAnalyzer:
         self.model = Config.LLM_MODEL
         self.max_tokens = 50
         self.temperature = Config.LLM_TEMPERATURE
+        
+        # セッション・タスク・モデル別のトークン使用量
+        self.ledger = TokenLedger(
+            ledger_file=Config.TOKEN_LEDGER_FILE,
+            flush_interval=Config.TOKEN_LEDGER_FLUSH_INTERVAL,
+            session_budget=Config.SESSION_TOKEN_BUDGET,
+            minimal_ratio=Config.MINIMAL_BUDGET_RATIO
+        )
+        atexit.register(self.ledger.flush)
     
-    def analyze_task_progress(self, current_task: str, player_status: str, surroundings: str = "", task_pool: list = None) -> Dict[str, Any]:
+    def analyze_task_progress(self, current_task: str, player_status: str, surroundings: str = "", task_pool: list = None, upcoming_tasks: list = None, session_id: str = None, task_key: str = None) -> Dict[str, Any]:
         """
         Unity状況とタスクを分析し、シンプルな判定を返す
         
+        upcoming_tasks: (step ID, 説明) のリスト。指定時は先読みモードで、どこまで完了したかを判定する
+        session_id / task_key: トークン台帳の集計キー（予算超過時は縮退する）
+        
         Returns:
             判定結果（keepまたはpick + task_id）
         """
         
+        session_id = session_id or TokenLedger.DEFAULT_SESSION
+        task_key = task_key or current_task
+        
+        # 予算超過セッションは段階的に安い経路へ縮退（デバウンスを長くするだけで判定は止めない）
+        level = self.ledger.degradation_level(session_id)
+        model = self.model
+        if level != DEGRADE_NONE:
+            model = Config.DEGRADED_LLM_MODEL or self.model
+            debounce = Config.MINIMAL_DEBOUNCE_SECONDS if level == DEGRADE_MINIMAL else Config.DEGRADED_DEBOUNCE_SECONDS
+            if self.ledger.seconds_since_last_call(session_id) < debounce:
+                return self._local_judgment("debounced")
+        call = {"model": model, "session_id": session_id, "task_key": task_key}
+        
+        if upcoming_tasks:
+            result = self._analyze_lookahead(current_task, player_status, surroundings, upcoming_tasks, call)
+        else:
+            result = self._analyze_current(current_task, player_status, surroundings, task_pool, call)
+        if level != DEGRADE_NONE:
+            result["degraded"] = "minimal" if level == DEGRADE_MINIMAL else "cheap_model"
+        return result
+    
+    def _analyze_current(self, current_task: str, player_status: str, surroundings: str, task_pool: list, call: Dict[str, Any]) -> Dict[str, Any]:
+        """現在のタスクが完了したかを判定し、次のタスクIDを返す"""
+        
         task_pool_str = "\n".join([f"- {task}" for task in (task_pool or [])])
         
         prompt = f"""あなたはUnityゲームのタスク判定システムです。プレイヤーの行動を分析し、現在のタスクが完了したかどうかを正確に判定してください。
@@ -73,17 +111,7 @@ class TaskProgressAnalyzer:
 
 回答:"""
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "あなたはシンプルなタスク判定システムです。keepまたはタスクIDのみで回答します。"},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=self.max_tokens,
-            temperature=self.temperature
-        )
-        
-        result_text = response.choices[0].message.content.strip().lower()
+        result_text = self._complete(prompt, **call)
         
         # 結果の解析
         if result_text == "keep":
@@ -100,6 +128,98 @@ class TaskProgressAnalyzer:
                 "completed": True,
                 "raw_response": result_text
             }
+    
+    def _analyze_lookahead(self, current_task: str, player_status: str, surroundings: str, upcoming_tasks: list, call: Dict[str, Any]) -> Dict[str, Any]:
+        """現在のタスク以降もまとめて判定し、最も先まで完了したstep IDを返す"""
+        
+        upcoming_str = "\n".join([f"{i}. {step_id}: {description}" for i, (step_id, description) in enumerate(upcoming_tasks, 1)])
+        step_ids = [step_id for step_id, _ in upcoming_tasks]
+        
+        prompt = f"""あなたはUnityゲームのタスク判定システムです。プレイヤーの行動を分析し、以下のタスクがどこまで完了したかを正確に判定してください。
+
+【現在のタスク】
+{current_task}
+
+【これから行うタスク（この順番で進める）】
+{upcoming_str}
+
+【プレイヤーの状況】
+{player_status}
+
+【周囲の環境】  
+{surroundings}
+
+判定基準：
+- タスクは上から順番に完了させる必要があります
+- 先頭から連続して完了しているタスクのうち、最も後ろのタスクIDを答えてください
+- 先頭のタスクが未達成、または進行中の場合 → "keep"
+
+例：1と2は完了、3は未完了 → 2番目のタスクID
+
+以下のいずれかのみで回答してください：
+
+1. 完了しているタスクがある場合: 最も先まで完了したタスクID（{", ".join(step_ids)}）
+2. 先頭のタスクが未完了の場合: "keep"
+
+回答:"""
+
+        result_text = self._complete(prompt, **call)
+        
+        # 回答は小文字化されるので、step IDも小文字で照合してシナリオ上の表記に戻す
+        completed_through = {step_id.lower(): step_id for step_id in step_ids}.get(result_text)
+        
+        # 候補外の回答は誤判定を避けるため継続扱い
+        if completed_through is None:
+            return {
+                "action": "keep",
+                "task_id": None,
+                "completed": False,
+                "raw_response": result_text
+            }
+        return {
+            "action": "next",
+            "task_id": None,
+            "completed_through": completed_through,
+            "completed": True,
+            "raw_response": result_text
+        }
+
+    
+    def _complete(self, prompt: str, model: str, session_id: str, task_key: str) -> str:
+        """LLMを呼び出し、usage をトークン台帳に記録して回答テキストを返す"""
+        self.ledger.mark_call(session_id)
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": "あなたはシンプルなタスク判定システムです。keepまたはタスクIDのみで回答します。"},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=self.max_tokens,
+            temperature=self.temperature
+        )
+        
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.ledger.record(
+                session_id=session_id,
+                task_key=task_key,
+                model=model,
+                prompt_tokens=usage.prompt_tokens or 0,
+                completion_tokens=usage.completion_tokens or 0
+            )
+        
+        return response.choices[0].message.content.strip().lower()
+    
+    @staticmethod
+    def _local_judgment(reason: str) -> Dict[str, Any]:
+        """LLMを呼ばずに継続と判定（予算超過時、デバウンス期間中の再判定）"""
+        return {
+            "action": "keep",
+            "task_id": None,
+            "completed": False,
+            "raw_response": None,
+            "degraded": reason
+        }
 
 
 class SimpleTaskJudgeSystem:
@@ -113,10 +233,14 @@ class SimpleTaskJudgeSystem:
         current_task: str, 
         player_status: str, 
         surroundings: str = "",
-        task_pool: list = None
+        task_pool: list = None,
+        upcoming_tasks: list = None,
+        session_id: str = None,
+        task_key: str = None
     ) -> Dict[str, Any]:
         """
         Unity状況を分析し、シンプルな判定を返す
+        upcoming_tasks を渡すと先読みモードで複数タスクの完了をまとめて判定する
         """
         
         print(f"🔍 タスク判定開始: {current_task}")
@@ -126,17 +250,27 @@ class SimpleTaskJudgeSystem:
             current_task=current_task,
             player_status=player_status,
             surroundings=surroundings,
-            task_pool=task_pool or ["step1", "step2", "step3", "step4", "step5", "step6", "step7"]
+            task_pool=task_pool or ["step1", "step2", "step3", "step4", "step5", "step6", "step7"],
+            upcoming_tasks=upcoming_tasks,
+            session_id=session_id,
+            task_key=task_key
         )
         
-        print(f"📊 判定結果: {result['action']}" + (f" -> {result.get('task_id')}" if result.get('task_id') else ""))
+        print(f"📊 判定結果: {result['action']}" + (f" -> {result.get('task_id')}" if result.get('task_id') else "")
+              + (f" (〜{result['completed_through']}まで完了)" if result.get('completed_through') else ""))
+        
+        data = {
+            "action": result["action"],
+            "task_id": result.get("task_id"),
+        }
+        if result.get("completed_through"):
+            data["completed_through"] = result["completed_through"]
+        if result.get("degraded"):
+            data["degraded"] = result["degraded"]
         
         return {
             "success": True,
-            "data": {
-                "action": result["action"],
-                "task_id": result.get("task_id"),
-            },
+            "data": data,
             "timestamp": datetime.now().isoformat(),
             "message": f"Task judgment completed: {result['action']}" + (f" -> {result.get('task_id')}" if result.get('task_id') else "")
         }
@@ -0,0 +1,188 @@
+"""
+Unity Task Management - オンデマンドプロファイラ
+稼働中の /api/environment-update を対象に、時間を区切って
+- cProfile（決定的プロファイル、pstats形式で出力）
+- サンプリング（sys._current_frames を定期取得、collapsed stack形式で出力）
+のいずれかを取得する。1リクエストだけの cProfile 取得にも対応
+"""
+
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+
+class ProfilerBusyError(Exception):
+    """既に別のプロファイルセッションが実行中"""
+
+
+class RequestProfiler:
+    MODES = ("cprofile", "sample")
+
+    def __init__(self, max_captures: int = 20):
+        self.max_captures = max_captures
+        self._lock = threading.Lock()
+        self._session: Optional[Dict[str, Any]] = None
+        self._captures: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def run_session(self, mode: str, duration: float, interval: float = 0.005) -> Dict[str, Any]:
+        """duration 秒の間、対象リクエストをプロファイルし、終了後に結果を返す（呼び出し元はその間待つ）"""
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiler mode: {mode}")
+        session = {
+            "capture_id": uuid.uuid4().hex,
+            "mode": mode,
+            "ends_at": time.monotonic() + duration,
+            "stats": None,
+            "samples": Counter(),
+            "threads": set(),
+            "requests": 0,
+            "skipped": 0,
+            "started_at": datetime.now().isoformat()
+        }
+        with self._lock:
+            if self._session is not None:
+                raise ProfilerBusyError("Another profiling session is running")
+            self._session = session
+
+        print(f"🔬 プロファイル開始: {mode} ({duration}秒)")
+        try:
+            if mode == "sample":
+                self._sample_until(session, interval)
+            else:
+                time.sleep(duration)
+        finally:
+            with self._lock:
+                self._session = None
+                # 以降に終わったリクエストは集計しない（返却済みの結果を後から変えない）
+                session["finished"] = True
+
+        capture = self._finish(session)
+        print(f"🔬 プロファイル終了: {session['requests']}リクエスト")
+        return capture
+
+    def begin_request(self, single: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        リクエスト処理の開始時に（そのスレッドで）呼ぶ
+        single=True なら実行中のセッションとは別に、このリクエストだけを cProfile で取得する
+        """
+        with self._lock:
+            session = self._session
+            if single:
+                session = {
+                    "capture_id": uuid.uuid4().hex,
+                    "mode": "cprofile",
+                    "stats": None,
+                    "requests": 0,
+                    "skipped": 0,
+                    "started_at": datetime.now().isoformat()
+                }
+            elif session is None or time.monotonic() >= session["ends_at"]:
+                return None
+
+            if session["mode"] == "sample":
+                session["threads"].add(threading.get_ident())
+                session["requests"] += 1
+                return {"session": session, "profile": None, "single": False}
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # 別のプロファイラが有効な環境（同時リクエストなど）では取得しない
+            with self._lock:
+                session["skipped"] += 1
+            return None
+        return {"session": session, "profile": profile, "single": single}
+
+    def end_request(self, token: Optional[Dict[str, Any]]):
+        """begin_request の戻り値を渡してプロファイルを締める"""
+        if token is None:
+            return
+        session = token["session"]
+        profile = token["profile"]
+        if profile is None:
+            with self._lock:
+                session["threads"].discard(threading.get_ident())
+            return
+
+        profile.disable()
+        with self._lock:
+            if session.get("finished"):
+                # セッション終了時点でまだ実行中だったリクエストは捨てる
+                return
+            if session["stats"] is None:
+                session["stats"] = pstats.Stats(profile)
+            else:
+                session["stats"].add(profile)
+            session["requests"] += 1
+        if token["single"]:
+            self._finish(session)
+
+    def get_capture(self, capture_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._captures.get(capture_id)
+
+    def _sample_until(self, session: Dict[str, Any], interval: float):
+        current = threading.get_ident()
+        while time.monotonic() < session["ends_at"]:
+            with self._lock:
+                threads = set(session["threads"])
+            frames = sys._current_frames()
+            for thread_id in threads:
+                frame = frames.get(thread_id)
+                if frame is None or thread_id == current:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                session["samples"][";".join(reversed(stack))] += 1
+            time.sleep(interval)
+
+    def _finish(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        capture = {
+            "capture_id": session["capture_id"],
+            "mode": session["mode"],
+            "requests": session["requests"],
+            "skipped": session["skipped"],
+            "started_at": session["started_at"],
+            "finished_at": datetime.now().isoformat(),
+            "stats": session["stats"],
+            "samples": session.get("samples")
+        }
+        with self._lock:
+            self._captures[capture["capture_id"]] = capture
+            while len(self._captures) > self.max_captures:
+                self._captures.popitem(last=False)
+        return capture
+
+
+def render_capture(capture: Dict[str, Any], output_format: str = "") -> tuple:
+    """
+    取得結果を (本文, Content-Type) に変換
+    - sample: collapsed stack（flamegraph.pl / speedscope にそのまま渡せる）
+    - cprofile: pstats のテキスト、format=raw なら pstats.Stats で読めるバイナリ（snakeviz 等で可視化）
+    """
+    if capture["mode"] == "sample":
+        lines = [f"{stack} {count}" for stack, count in capture["samples"].most_common()]
+        return "\n".join(lines) + "\n", "text/plain; charset=utf-8"
+
+    stats = capture["stats"]
+    if output_format == "raw":
+        return marshal.dumps(stats.stats if stats is not None else {}), "application/octet-stream"
+    if stats is None:
+        return "No requests were profiled.\n", "text/plain; charset=utf-8"
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats("cumulative").print_stats(80)
+    return stream.getvalue(), "text/plain; charset=utf-8"
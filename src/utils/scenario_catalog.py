@@ -0,0 +1,170 @@
+"""
+Unity Task Management - シナリオカタログ
+index.json に登録されたシナリオを初回利用時に読み込み、LRUでキャッシュする
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+
+class ScenarioNotFoundError(KeyError):
+    """インデックスに存在しないシナリオが指定された"""
+
+
+class Scenario:
+    """読み込み済みのシナリオ定義（読み取り専用として扱う）"""
+
+    def __init__(self, scenario_id: str, path: str, data: Dict[str, Any], digest: str, stat_key: tuple):
+        self.scenario_id = scenario_id
+        self.path = path
+        self.task_metadata = data.get('task_metadata', {})
+        self.tasks = data.get('tasks', {})
+        self.task_order = data.get('task_order', [])
+        self.current_step = data.get('current_step', self.task_order[0] if self.task_order else "step1")
+        self.digest = digest
+        self.stat_key = stat_key
+
+    def copy_tasks(self) -> Dict[str, Any]:
+        return copy.deepcopy(self.tasks)
+
+
+def _stat_key(path: str) -> tuple:
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+class ScenarioCatalog:
+    """シナリオディレクトリの軽量インデックス + 遅延読み込み + LRUキャッシュ + 変更監視"""
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, scenario_dir: str, cache_size: int = 8):
+        self.scenario_dir = scenario_dir
+        self.cache_size = max(1, cache_size)
+        self._lock = threading.RLock()
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._index_stat: Optional[tuple] = None
+        self._cache: "OrderedDict[str, Scenario]" = OrderedDict()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.load_index()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.scenario_dir, self.INDEX_FILE)
+
+    def load_index(self):
+        """index.json を読み込む（シナリオ本体は読まない）"""
+        try:
+            stat_key = _stat_key(self.index_path)
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get('scenarios', {})
+        except FileNotFoundError:
+            print(f"⚠️ {self.index_path} が見つかりません。シナリオカタログは空です。")
+            stat_key, entries = None, {}
+        except json.JSONDecodeError as e:
+            print(f"⚠️ {self.index_path} の読み込みエラー: {e}")
+            return
+
+        with self._lock:
+            self._index = entries
+            self._index_stat = stat_key
+            # インデックスから消えた・参照先ファイルが変わったシナリオはキャッシュからも外す
+            for scenario_id, scenario in list(self._cache.items()):
+                entry = entries.get(scenario_id)
+                if entry is None or os.path.join(self.scenario_dir, entry['file']) != scenario.path:
+                    del self._cache[scenario_id]
+        print(f"✓ シナリオインデックスを読み込みました: {len(entries)}件")
+
+    def list_scenarios(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "scenario_id": scenario_id,
+                    "title": entry.get('title', scenario_id),
+                    "loaded": scenario_id in self._cache
+                }
+                for scenario_id, entry in self._index.items()
+            ]
+
+    def get(self, scenario_id: str) -> Scenario:
+        """シナリオを返す。未読み込みならここで読み込み、キャッシュに入れる"""
+        with self._lock:
+            scenario = self._cache.get(scenario_id)
+            if scenario is not None:
+                self._cache.move_to_end(scenario_id)
+                return scenario
+
+            entry = self._index.get(scenario_id)
+            if entry is None:
+                raise ScenarioNotFoundError(f"Unknown scenario: {scenario_id}")
+            scenario = self._read(scenario_id, os.path.join(self.scenario_dir, entry['file']))
+            self._cache[scenario_id] = scenario
+            while len(self._cache) > self.cache_size:
+                evicted, _ = self._cache.popitem(last=False)
+                print(f"♻️ シナリオをキャッシュから除外: {evicted}")
+            print(f"✓ シナリオを読み込みました: {scenario_id} ({len(scenario.tasks)}個のタスク)")
+            return scenario
+
+    def _read(self, scenario_id: str, path: str) -> Scenario:
+        stat_key = _stat_key(path)
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw.decode('utf-8'))
+        return Scenario(scenario_id, path, data, hashlib.sha256(raw).hexdigest(), stat_key)
+
+    def check_for_changes(self):
+        """インデックスとキャッシュ済みシナリオの変更を確認し、変わったものだけ差し替える"""
+        try:
+            index_stat = _stat_key(self.index_path)
+        except FileNotFoundError:
+            index_stat = None
+        if index_stat != self._index_stat:
+            self.load_index()
+
+        with self._lock:
+            cached = list(self._cache.values())
+
+        for scenario in cached:
+            try:
+                if _stat_key(scenario.path) == scenario.stat_key:
+                    continue
+                # ロックの外で新しい定義を組み立て、成功した場合のみ入れ替える
+                reloaded = self._read(scenario.scenario_id, scenario.path)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ シナリオ再読み込みエラー ({scenario.scenario_id}): {e}")
+                continue
+
+            with self._lock:
+                if self._cache.get(scenario.scenario_id) is not scenario:
+                    continue
+                self._cache[scenario.scenario_id] = reloaded
+            if reloaded.digest != scenario.digest:
+                print(f"🔄 シナリオを再読み込みしました: {scenario.scenario_id}")
+
+    def start_watcher(self, interval: float):
+        """バックグラウンドでファイル変更を監視（interval <= 0 なら何もしない）"""
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    self.check_for_changes()
+                except Exception as e:
+                    print(f"⚠️ シナリオ監視エラー: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="scenario-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
@@ -0,0 +1,148 @@
+"""
+Unity Task Management - タスク期限スケジューラ
+アクティブなタスクごとに期限タイマーを持ち、期限切れイベントの記録・自動進行・
+無操作セッションの破棄を行う
+"""
+
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional
+
+from utils.timer_wheel import TimerWheel
+
+
+class TaskDeadlineScheduler:
+    """
+    key（セッションID、従来のグローバル進行は "default"）ごとに
+    - 現在のタスクの期限タイマー（task_timeout > 0 の場合）
+    - 無操作タイマー（idle_timeout > 0 の場合、"default" は対象外）
+    を管理する
+    """
+
+    DEFAULT_KEY = "default"
+
+    def __init__(
+        self,
+        wheel: TimerWheel,
+        task_timeout: float,
+        auto_progression: bool,
+        idle_timeout: float = 0,
+        on_evict: Optional[Callable[[str], None]] = None,
+        max_events: int = 200
+    ):
+        self.wheel = wheel
+        self.task_timeout = task_timeout
+        self.auto_progression = auto_progression
+        self.idle_timeout = idle_timeout
+        self.on_evict = on_evict
+        self._lock = threading.Lock()
+        self._tracked: Dict[str, Dict[str, Any]] = {}
+        self._events: deque = deque(maxlen=max_events)
+
+    def touch(self, key: Optional[str], manager):
+        """リクエストのたびに呼ぶ。タスクが変わっていれば期限を張り直し、無操作タイマーを延長する"""
+        key = key or self.DEFAULT_KEY
+        with self._lock:
+            state = self._tracked.setdefault(key, {"step": None, "deadline_timer": None, "idle_timer": None})
+            state["manager"] = manager
+
+            if self.task_timeout > 0 and state["step"] != manager.current_step:
+                self.wheel.cancel(state["deadline_timer"])
+                self._schedule_deadline(key, state)
+
+            if self.idle_timeout > 0 and key != self.DEFAULT_KEY:
+                self.wheel.cancel(state["idle_timer"])
+                self._schedule_idle(key, state)
+
+    def forget(self, key: str):
+        with self._lock:
+            state = self._tracked.pop(key, None)
+        if state is not None:
+            self.wheel.cancel(state["deadline_timer"])
+            self.wheel.cancel(state["idle_timer"])
+
+    def recent_events(self, key: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [event for event in self._events if key is None or event["session_id"] == key]
+
+    def touch_deadline(self, key: str):
+        """現在のタスクで期限を張り直す（無操作タイマーは延長しない）"""
+        with self._lock:
+            state = self._tracked.get(key)
+            if state is None or self.task_timeout <= 0:
+                return
+            self.wheel.cancel(state["deadline_timer"])
+            self._schedule_deadline(key, state)
+
+    def _schedule_deadline(self, key: str, state: Dict[str, Any]):
+        """_lock を保持した状態で呼ぶ（全タスク完了済みなら期限は張らない）"""
+        manager = state["manager"]
+        step = manager.current_step
+        state["step"] = step
+        state["deadline_timer"] = None
+        if not manager.tasks.get(step, {}).get("completed"):
+            state["deadline_timer"] = self.wheel.schedule(self.task_timeout, lambda: self._on_deadline(key, step))
+
+    def _schedule_idle(self, key: str, state: Dict[str, Any]):
+        """_lock を保持した状態で呼ぶ（発火時に自分が最新の無操作タイマーかを確認できるようIDを渡す）"""
+        timer = {}
+        timer["id"] = self.wheel.schedule(self.idle_timeout, lambda: self._on_idle(key, timer["id"]))
+        state["idle_timer"] = timer["id"]
+
+    def _on_deadline(self, key: str, step: str):
+        with self._lock:
+            state = self._tracked.get(key)
+            if state is None or state["step"] != step:
+                return
+            state["deadline_timer"] = None
+            manager = state["manager"]
+
+        if manager.current_step != step or manager.tasks.get(step, {}).get("completed"):
+            # 期限前に進んでいた場合は新しいタスクの期限を張り直すだけ
+            self.touch_deadline(key)
+            return
+
+        has_next = None
+        if self.auto_progression:
+            # 確認後に判定で進んだ場合に二重に進めないよう、期限を張ったタスクのままのときだけ完了にする
+            has_next = manager.complete_current_task(expected_step=step)
+            if has_next is None:
+                self.touch_deadline(key)
+                return
+
+        event = {
+            "type": "task_timeout",
+            "session_id": key,
+            "step": step,
+            "auto_progressed": False,
+            "timestamp": datetime.now().isoformat()
+        }
+        print(f"⏰ タスク期限切れ: {step} ({key})")
+
+        if self.auto_progression:
+            event["auto_progressed"] = True
+            event["next_step"] = manager.current_step if has_next else None
+            print(f"   → 自動進行: {event['next_step'] or '全タスク完了'}")
+
+        with self._lock:
+            self._events.append(event)
+        if self.auto_progression:
+            self.touch_deadline(key)
+
+    def _on_idle(self, key: str, timer_id: int):
+        with self._lock:
+            state = self._tracked.get(key)
+            if state is None or state["idle_timer"] != timer_id:
+                # 発火後に別のリクエストで無操作タイマーが張り直されていれば破棄しない
+                return
+            del self._tracked[key]
+            self.wheel.cancel(state["deadline_timer"])
+            self._events.append({
+                "type": "session_evicted",
+                "session_id": key,
+                "timestamp": datetime.now().isoformat()
+            })
+        print(f"🧹 無操作のためセッションを破棄: {key}")
+        if self.on_evict is not None:
+            self.on_evict(key)
@@ -0,0 +1,89 @@
+"""
+Unity Task Management - ハッシュドタイマーホイール
+登録・取消はO(1)。1ティックごとに1スロットだけを処理するので、数万件のタイマーでも負荷はほぼ一定
+"""
+
+import itertools
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+
+class TimerWheel:
+    """tick 秒刻み・slots 個のスロットを持つタイマーホイール（バックグラウンドスレッドで駆動）"""
+
+    def __init__(self, tick: float = 0.1, slots: int = 512):
+        self.tick = tick
+        self.slots = slots
+        self._wheel = [dict() for _ in range(slots)]
+        self._timer_slots: Dict[int, int] = {}
+        self._ids = itertools.count(1)
+        self._current = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._timer_slots)
+
+    def schedule(self, delay: float, callback: Callable[[], Any]) -> int:
+        """delay 秒後に callback を呼ぶタイマーを登録し、タイマーIDを返す"""
+        ticks = max(1, int(round(delay / self.tick)))
+        timer_id = next(self._ids)
+        with self._lock:
+            slot = (self._current + ticks) % self.slots
+            # 1周で届かない分は周回数として持たせる
+            self._wheel[slot][timer_id] = [(ticks - 1) // self.slots, callback]
+            self._timer_slots[timer_id] = slot
+        return timer_id
+
+    def cancel(self, timer_id: Optional[int]) -> bool:
+        if timer_id is None:
+            return False
+        with self._lock:
+            slot = self._timer_slots.pop(timer_id, None)
+            if slot is None:
+                return False
+            del self._wheel[slot][timer_id]
+            return True
+
+    def advance(self):
+        """1ティック進め、期限が来たタイマーのコールバックを実行"""
+        due = []
+        with self._lock:
+            self._current = (self._current + 1) % self.slots
+            bucket = self._wheel[self._current]
+            for timer_id, entry in list(bucket.items()):
+                if entry[0] > 0:
+                    entry[0] -= 1
+                    continue
+                del bucket[timer_id]
+                del self._timer_slots[timer_id]
+                due.append(entry[1])
+
+        for callback in due:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ タイマー処理エラー: {e}")
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            next_tick = time.monotonic() + self.tick
+            while not self._stop.wait(max(0.0, next_tick - time.monotonic())):
+                self.advance()
+                next_tick += self.tick
+
+        self._thread = threading.Thread(target=run, name="timer-wheel", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,137 @@
+"""
+Unity Task Management - トークン使用量台帳
+OpenAIの usage をセッション・タスク・モデル別に集計し、定期的にファイルへ書き出す
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any
+
+
+# 予算超過時の縮退レベル
+DEGRADE_NONE = 0
+DEGRADE_CHEAP = 1        # 小さいモデル + デバウンス
+DEGRADE_MINIMAL = 2      # 小さいモデル + さらに長いデバウンス（判定自体は止めない）
+
+
+class TokenLedger:
+    """
+    メモリ上でトークン数を集計し、flush_interval 秒ごとにJSONへ保存
+    セッション・タスク・モデル別の集計は再起動後も引き継ぐが、予算判定に使う合計は起動ごとに数え直す
+    """
+
+    # セッションIDなしのリクエストの集計キー（予算の対象外）
+    DEFAULT_SESSION = "default"
+
+    def __init__(self, ledger_file: str = "", flush_interval: float = 30, session_budget: int = 0, minimal_ratio: float = 1.5):
+        self.ledger_file = ledger_file
+        self.flush_interval = flush_interval
+        self.session_budget = session_budget
+        self.minimal_ratio = minimal_ratio
+        self._lock = threading.Lock()
+        self._entries: Dict[tuple, Dict[str, int]] = {}
+        self._session_totals: Dict[str, int] = {}
+        self._last_call: Dict[str, float] = {}
+        self._last_flush = time.monotonic()
+        self._dirty = False
+        self._load()
+
+    def record(self, session_id: str, task_key: str, model: str, prompt_tokens: int, completion_tokens: int):
+        """1回のLLM呼び出し分を加算（必要なら保存も行う）"""
+        key = (session_id, task_key, model)
+        with self._lock:
+            entry = self._entries.setdefault(key, {"prompt_tokens": 0, "completion_tokens": 0, "calls": 0})
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            entry["calls"] += 1
+            self._session_totals[session_id] = self._session_totals.get(session_id, 0) + prompt_tokens + completion_tokens
+            self._dirty = True
+            should_flush = time.monotonic() - self._last_flush >= self.flush_interval
+        if should_flush:
+            self.flush()
+
+    def mark_call(self, session_id: str):
+        with self._lock:
+            self._last_call[session_id] = time.monotonic()
+
+    def seconds_since_last_call(self, session_id: str) -> float:
+        with self._lock:
+            last = self._last_call.get(session_id)
+        return float("inf") if last is None else time.monotonic() - last
+
+    def session_total(self, session_id: str) -> int:
+        with self._lock:
+            return self._session_totals.get(session_id, 0)
+
+    def degradation_level(self, session_id: str) -> int:
+        """セッションの使用量から縮退レベルを返す（予算0は無制限、セッションIDなしは対象外）"""
+        if self.session_budget <= 0 or session_id == self.DEFAULT_SESSION:
+            return DEGRADE_NONE
+        total = self.session_total(session_id)
+        if total >= self.session_budget * self.minimal_ratio:
+            return DEGRADE_MINIMAL
+        if total >= self.session_budget:
+            return DEGRADE_CHEAP
+        return DEGRADE_NONE
+
+    def reset_session(self, session_id: str):
+        """予算判定用の合計とデバウンス状態を破棄（無操作でセッションを破棄したとき。タスク別の集計は残す）"""
+        with self._lock:
+            self._session_totals.pop(session_id, None)
+            self._last_call.pop(session_id, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions: Dict[str, int] = {}
+            for (session_id, _, _), entry in self._entries.items():
+                sessions[session_id] = sessions.get(session_id, 0) + entry["prompt_tokens"] + entry["completion_tokens"]
+            return {
+                "sessions": sessions,
+                "budget_usage": dict(self._session_totals),
+                "entries": [
+                    {"session_id": session_id, "task": task_key, "model": model, **entry}
+                    for (session_id, task_key, model), entry in self._entries.items()
+                ],
+                "session_budget": self.session_budget,
+                "updated_at": datetime.now().isoformat()
+            }
+
+    def flush(self):
+        """変更があればファイルへ書き出す（一時ファイル経由で置き換え）"""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self.ledger_file or not self._dirty:
+                return
+            self._dirty = False
+        data = self.snapshot()
+        try:
+            directory = os.path.dirname(self.ledger_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_file = f"{self.ledger_file}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.ledger_file)
+        except Exception as e:
+            print(f"⚠️ トークン台帳の保存エラー: {e}")
+
+    def _load(self):
+        """前回保存した集計値を引き継ぐ（予算判定用の合計は引き継がない）"""
+        if not self.ledger_file or not os.path.exists(self.ledger_file):
+            return
+        try:
+            with open(self.ledger_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ トークン台帳の読み込みエラー: {e}")
+            return
+        for entry in data.get("entries", []):
+            key = (entry["session_id"], entry["task"], entry["model"])
+            self._entries[key] = {
+                "prompt_tokens": entry.get("prompt_tokens", 0),
+                "completion_tokens": entry.get("completion_tokens", 0),
+                "calls": entry.get("calls", 0)
+            }
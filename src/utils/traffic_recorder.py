@@ -0,0 +1,181 @@
+"""
+Unity Task Management - 環境更新トラフィックの記録と再生用スタブ
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+
+class TrafficRecorder:
+    """/api/environment-update のリクエストと判定結果をローテーション付きトレースファイルへ記録"""
+
+    def __init__(self, trace_file: str, max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3):
+        self.trace_file = trace_file
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+        self._stream = None
+
+    def record(
+        self,
+        request_data: Dict[str, Any],
+        result: Dict[str, Any],
+        status: int,
+        latency_ms: float,
+        mode: str = "sync",
+        session_id: Optional[str] = None,
+        scenario_id: Optional[str] = None,
+        arrived_at: Optional[float] = None
+    ):
+        """
+        1リクエスト分を1行のJSONとして追記（キーは短縮形でコンパクトに保存）
+        arrived_at はリクエストの到着時刻（time.time()）。再生はこの間隔で行うため、判定後の時刻ではなく受付時の時刻を渡す
+        mode="async" はジョブの最終判定で、latency_ms は受付からジョブ完了まで
+        session_id / scenario_id はヘッダー・クエリで指定された分も含めて記録し、再生時にヘッダーで送り直す
+        """
+        data = result.get("data") or {}
+        res = {
+            "action": data.get("action"),
+            "task_id": data.get("task_id"),
+        }
+        if data.get("completed_steps"):
+            res["completed_steps"] = data["completed_steps"]
+        entry = {
+            "t": round(arrived_at if arrived_at is not None else time.time(), 6),
+            "req": request_data,
+            "res": res,
+            "st": status,
+            "ms": round(latency_ms, 3),
+        }
+        if mode != "sync":
+            entry["mode"] = mode
+        if session_id:
+            entry["sid"] = session_id
+        if scenario_id:
+            entry["scn"] = scenario_id
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        try:
+            with self._lock:
+                if self._stream is None:
+                    self._open()
+                if self.max_bytes > 0 and self._stream.tell() + len(line.encode("utf-8")) > self.max_bytes:
+                    self._rotate()
+                self._stream.write(line)
+                self._stream.flush()
+        except Exception as e:
+            print(f"⚠️ トレース記録エラー: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+
+    def _open(self):
+        directory = os.path.dirname(self.trace_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._stream = open(self.trace_file, "a", encoding="utf-8")
+
+    def _rotate(self):
+        """trace.jsonl → trace.jsonl.1 → ... → trace.jsonl.N の順にずらす"""
+        self._stream.close()
+        self._stream = None
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                src = f"{self.trace_file}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.trace_file}.{i + 1}")
+            os.replace(self.trace_file, f"{self.trace_file}.1")
+        else:
+            os.remove(self.trace_file)
+        self._open()
+
+
+def trace_files(trace_file: str) -> List[str]:
+    """ローテーション済みのファイルも含め、古い順にトレースファイルを返す"""
+    files = []
+    i = 1
+    while os.path.exists(f"{trace_file}.{i}"):
+        files.append(f"{trace_file}.{i}")
+        i += 1
+    files.reverse()
+    if os.path.exists(trace_file):
+        files.append(trace_file)
+    return files
+
+
+def load_trace(trace_file: str) -> List[Dict[str, Any]]:
+    """トレースを読み込み、時刻順のエントリ一覧を返す"""
+    entries = []
+    for path in trace_files(trace_file):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # 書き込み途中で切れた行は無視
+                    continue
+    entries.sort(key=lambda e: e.get("t", 0))
+    return entries
+
+
+def judgment_key(current_task: str, player_status: str, surroundings: str) -> str:
+    return "\x1f".join([current_task or "", player_status or "", surroundings or ""])
+
+
+class RecordedJudgeSystem:
+    """記録済みの判定結果から回答するスタブLLM（SimpleTaskJudgeSystemと同じインターフェース）"""
+
+    def __init__(self, trace_file: str):
+        self.judgments: Dict[str, Dict[str, Any]] = {}
+        for entry in load_trace(trace_file):
+            req = entry.get("req") or {}
+            res = entry.get("res") or {}
+            if entry.get("st") != 200 or res.get("action") is None:
+                continue
+            key = judgment_key(req.get("current_task", ""), req.get("player_status", ""), req.get("surroundings", ""))
+            self.judgments[key] = res
+        print(f"✓ 記録済み判定を読み込みました: {len(self.judgments)}件 ({trace_file})")
+
+    def judge_task_status(
+        self,
+        current_task: str,
+        player_status: str,
+        surroundings: str = "",
+        task_pool: list = None,
+        upcoming_tasks: list = None,
+        session_id: str = None,
+        task_key: str = None
+    ) -> Dict[str, Any]:
+        recorded = self.judgments.get(judgment_key(current_task, player_status, surroundings))
+        if recorded is None:
+            # 未記録の入力は継続扱い
+            action, task_id = "keep", None
+        else:
+            action, task_id = recorded["action"], recorded.get("task_id")
+
+        print(f"📼 記録済み判定: {action}" + (f" -> {task_id}" if task_id else ""))
+
+        data = {
+            "action": action,
+            "task_id": task_id,
+        }
+        if action == "next" and upcoming_tasks:
+            # 先読みモードでは記録時に最終的に完了したstepを再現する
+            completed_steps = (recorded or {}).get("completed_steps") or [upcoming_tasks[0][0]]
+            data["completed_through"] = completed_steps[-1]
+
+        return {
+            "success": True,
+            "data": data,
+            "timestamp": datetime.now().isoformat(),
+            "message": f"Task judgment completed: {action}" + (f" -> {task_id}" if task_id else "")
+        }
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Unity Task Management - HTTP JSON とバイナリプロトコルの1更新あたりのオーバーヘッド比較
+
+LLMの応答時間を除外するため、サーバーはスタブLLMで起動する：
+    cd src
+    LLM_STUB_TRACE=none BINARY_PROTOCOL_ENABLED=true DEBUG_MODE=false python app.py
+"""
+
+import requests
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Tuple
+
+# src/utils をインポートできるようにする
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from utils.binary_protocol import BinaryTelemetryClient, encode_frame
+
+SESSION_ID = "benchmark"
+
+# 同じ観測を、従来の自由記述JSONと構造化フレームの両方で表現
+HTTP_PAYLOAD = {
+    "current_task": "中会議室のカギを開ける",
+    "player_status": "プレイヤーは中会議室の前に立っている。鍵を探している。",
+    "surroundings": "中会議室のドア、鍵穴、廊下、他の部屋のドアが見える",
+    "session_id": SESSION_ID
+}
+
+BINARY_FRAME = {
+    "task": "中会議室のカギを開ける",
+    "flags": {"has_key": False, "door_unlocked": False, "in_room": False},
+    "pos": {"player": [1.25, 0.0, -3.5], "door": [2.0, 0.0, -4.0]},
+    "session": SESSION_ID
+}
+
+
+def summarize(label: str, samples: List[float], payload_bytes: int):
+    samples = sorted(samples)
+
+    def percentile(p):
+        return samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
+
+    mean = sum(samples) / len(samples)
+    print(f"   {label:<14}{mean:>9.3f}{percentile(50):>9.3f}{percentile(99):>9.3f}{payload_bytes:>10}")
+
+
+def bench_http(base_url: str, count: int) -> List[float]:
+    samples = []
+    with requests.Session() as session:
+        for _ in range(count):
+            started = time.perf_counter()
+            response = session.post(f"{base_url}/api/environment-update", json=HTTP_PAYLOAD)
+            response.json()
+            samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def bench_binary(host: str, port: int, count: int) -> List[float]:
+    client = BinaryTelemetryClient(host, port)
+    samples = []
+    try:
+        for _ in range(count):
+            started = time.perf_counter()
+            client.request(BINARY_FRAME)
+            samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        client.close()
+    return samples
+
+
+def bench_binary_pipelined(host: str, port: int, count: int, window: int) -> Tuple[float, int]:
+    """
+    応答を待たずに送り続けた場合のスループット（成功した更新/秒）と失敗数
+    未応答のフレームは window 件（サーバーの JOB_QUEUE_SIZE）までに抑え、キュー満杯のエラー応答を計測に含めない
+    """
+    client = BinaryTelemetryClient(host, port)
+    try:
+        started = time.perf_counter()
+        sent = ok = 0
+        for _ in range(min(window, count)):
+            client.send(BINARY_FRAME)
+            sent += 1
+        for _ in range(count):
+            if client.receive().get("ok"):
+                ok += 1
+            if sent < count:
+                client.send(BINARY_FRAME)
+                sent += 1
+        return ok / (time.perf_counter() - started), count - ok
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP JSON とバイナリプロトコルのオーバーヘッド比較")
+    parser.add_argument("--url", default="http://localhost:5000", help="HTTPサーバー")
+    parser.add_argument("--host", default="localhost", help="バイナリプロトコルのホスト")
+    parser.add_argument("--port", type=int, default=5001, help="バイナリプロトコルのポート")
+    parser.add_argument("-n", "--count", type=int, default=500, help="計測する更新回数")
+    parser.add_argument("--window", type=int, default=100, help="パイプライン送信で未応答にしておく最大フレーム数（サーバーの JOB_QUEUE_SIZE 以下）")
+    args = parser.parse_args()
+
+    if args.window <= 0:
+        parser.error("--window は正の値を指定してください")
+
+    # ウォームアップ（接続確立・シナリオ読み込みを計測から外す）
+    bench_http(args.url, 10)
+    bench_binary(args.host, args.port, 10)
+
+    http_bytes = len(json.dumps(HTTP_PAYLOAD).encode("utf-8"))
+    binary_bytes = len(encode_frame({**BINARY_FRAME, "id": 1}))
+
+    print(f"\n📊 === 1更新あたりの往復時間 (ms, n={args.count}) ===")
+    print(f"   {'':<14}{'mean':>9}{'p50':>9}{'p99':>9}{'bytes':>10}")
+    summarize("HTTP JSON", bench_http(args.url, args.count), http_bytes)
+    summarize("Binary TCP", bench_binary(args.host, args.port, args.count), binary_bytes)
+    throughput, failed = bench_binary_pipelined(args.host, args.port, args.count, args.window)
+    print(f"\n🚀 バイナリ（パイプライン送信, window={args.window}）: {throughput:.0f} 更新/秒")
+    if failed:
+        print(f"⚠️  失敗した応答: {failed}件（--window をサーバーの JOB_QUEUE_SIZE 以下にしてください）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Unity Task Management - 単体テスト共通のフィクスチャ
+"""
+
+import os
+import sys
+
+import pytest
+
+# src をインポートできるようにする
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from task_manager import TaskManager
+from utils.scenario_catalog import Scenario
+
+
+@pytest.fixture
+def make_manager():
+    """step1..stepN を持つ、保存しないメモリ上の TaskManager を作る"""
+    def make(steps: int = 4) -> TaskManager:
+        order = [f"step{i}" for i in range(1, steps + 1)]
+        data = {
+            "tasks": {step: {"description": f"タスク {step}", "completed": False} for step in order},
+            "task_order": order
+        }
+        return TaskManager(tasks_file=None, scenario=Scenario("test", "test.json", data, "digest", (0, 0)))
+    return make
+
+
+@pytest.fixture
+def advance():
+    """タイマーホイールを手動で ticks ティック進める"""
+    def advance_wheel(wheel, ticks: int):
+        for _ in range(ticks):
+            wheel.advance()
+    return advance_wheel
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Unity Task Management - トラフィック再生ツール
+TRAFFIC_RECORDING=true で記録したトレースを元の時間間隔（またはN倍速）でサーバーに再送し、
+レイテンシ分布と記録時との判定の食い違いを表示する
+
+記録済み判定で応答させたい場合はサーバーを LLM_STUB_TRACE=<トレースファイル> で起動する
+"""
+
+import requests
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+# src/utils をインポートできるようにする
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from utils.traffic_recorder import load_trace
+
+
+class TrafficReplayer:
+    JOB_POLL_WAIT = 30  # ジョブ結果のロングポーリング1回あたりの待ち時間（秒）
+
+    def __init__(self, base_url="http://localhost:5000", speed: float = 1.0, workers: int = 8):
+        self.base_url = base_url
+        self.speed = speed
+        self.workers = workers
+        self._lock = threading.Lock()
+        self.results: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def _headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        """記録時のセッション・シナリオをヘッダーで送り直す"""
+        headers = {"Content-Type": "application/json"}
+        if entry.get("sid"):
+            headers["X-Session-Id"] = entry["sid"]
+        if entry.get("scn"):
+            headers["X-Scenario-Id"] = entry["scn"]
+        return headers
+
+    def reset_tasks(self, entries: List[Dict[str, Any]] = None) -> bool:
+        """再生前にサーバーのタスク状態をリセット（トレースに含まれるセッションごと）"""
+        targets = {}
+        for entry in entries or []:
+            targets.setdefault((entry.get("sid"), entry.get("scn")), entry)
+        targets.setdefault((None, None), {})
+        try:
+            return all(
+                requests.post(f"{self.base_url}/api/reset-tasks", headers=self._headers(entry)).status_code == 200
+                for entry in targets.values()
+            )
+        except Exception as e:
+            print(f"❌ タスクリセット失敗: {e}")
+            return False
+
+    def _wait_for_job(self, poll_url: str) -> tuple:
+        """ジョブが終わるまでロングポーリングし、(HTTPステータス相当, 判定データ) を返す"""
+        while True:
+            response = requests.get(f"{self.base_url}{poll_url}", params={"wait": self.JOB_POLL_WAIT})
+            if response.status_code != 200:
+                return response.status_code, {}
+            job = response.json()["data"]
+            if job["status"] == "done":
+                return 200, (job["result"] or {}).get("data") or {}
+            if job["status"] == "failed":
+                return 500, {"action": "keep", "task_id": None}
+
+    def _send(self, index: int, entry: Dict[str, Any], lag_ms: float):
+        started = time.perf_counter()
+        is_async = entry.get("mode") == "async"
+        try:
+            # ジョブモードで記録されたリクエストはジョブモードで送り、最終判定まで待つ
+            response = requests.post(
+                f"{self.base_url}/api/environment-update",
+                json=entry.get("req", {}),
+                params={"mode": "async"} if is_async else None,
+                headers=self._headers(entry)
+            )
+            status = response.status_code
+            data = response.json().get("data") or {}
+            if is_async and status == 202:
+                status, data = self._wait_for_job(data["poll_url"])
+        except Exception as e:
+            status = None
+            data = {"error": str(e)}
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        recorded = entry.get("res") or {}
+        diverged = (
+            status != entry.get("st")
+            or data.get("action") != recorded.get("action")
+            or data.get("task_id") != recorded.get("task_id")
+        )
+        with self._lock:
+            self.results.append({
+                "index": index,
+                "status": status,
+                "latency_ms": latency_ms,
+                "lag_ms": lag_ms,
+                "recorded_ms": entry.get("ms"),
+                "recorded": recorded,
+                "replayed": {"action": data.get("action"), "task_id": data.get("task_id")},
+                "diverged": diverged,
+                "request": entry.get("req", {}),
+            })
+
+    def replay(self, entries: List[Dict[str, Any]]):
+        """記録時刻の間隔を speed 倍に縮めてリクエストを発行"""
+        if not entries:
+            print("⚠️ 再生するエントリがありません")
+            return
+
+        print(f"▶️  {len(entries)}件を {self.speed}x で再生します")
+        origin = entries[0]["t"]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for index, entry in enumerate(entries):
+                due = (entry["t"] - origin) / self.speed
+                wait = due - (time.perf_counter() - start)
+                if wait > 0:
+                    time.sleep(wait)
+                lag_ms = max(0.0, -wait) * 1000
+                executor.submit(self._send, index, entry, lag_ms)
+        self.results.sort(key=lambda r: r["index"])
+
+    def print_report(self):
+        print("\n📊 === 再生結果 ===")
+        if not self.results:
+            return
+
+        print(f"リクエスト数: {len(self.results)}")
+        print("\n⏱️  レイテンシ (ms):")
+        print(f"   {'':<8}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+        self._print_distribution("再生", [r["latency_ms"] for r in self.results])
+        self._print_distribution("記録時", [r["recorded_ms"] for r in self.results if r["recorded_ms"] is not None])
+
+        late = [r for r in self.results if r["lag_ms"] > 50]
+        if late:
+            print(f"\n⚠️  予定時刻から50ms以上遅れて送信: {len(late)}件（--workers を増やしてください）")
+
+        diverged = [r for r in self.results if r["diverged"]]
+        print(f"\n🔀 判定の食い違い: {len(diverged)}/{len(self.results)}")
+        for r in diverged:
+            print(f"   #{r['index']} {r['request'].get('current_task', '')}")
+            print(f"      記録: {r['recorded'].get('action')} {r['recorded'].get('task_id') or ''}")
+            print(f"      再生: {r['replayed'].get('action')} {r['replayed'].get('task_id') or ''} (HTTP {r['status']})")
+
+    @staticmethod
+    def _print_distribution(label: str, values: List[float]):
+        if not values:
+            return
+        values = sorted(values)
+
+        def percentile(p):
+            return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+        print(f"   {label:<8}{percentile(50):>10.1f}{percentile(90):>10.1f}{percentile(99):>10.1f}{values[-1]:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="記録したトラフィックをサーバーに再送する")
+    parser.add_argument("trace", help="トレースファイル（ローテーション済みの .1, .2 ... も読み込む）")
+    parser.add_argument("--url", default="http://localhost:5000", help="再生先サーバー")
+    parser.add_argument("--speed", type=float, default=1.0, help="再生速度の倍率（例: 10 で10倍速）")
+    parser.add_argument("--workers", type=int, default=8, help="同時送信数の上限")
+    parser.add_argument("--no-reset", action="store_true", help="再生前にタスクをリセットしない")
+    args = parser.parse_args()
+
+    if args.speed <= 0:
+        parser.error("--speed は正の値を指定してください")
+
+    replayer = TrafficReplayer(base_url=args.url, speed=args.speed, workers=args.workers)
+    entries = load_trace(args.trace)
+    if not args.no_reset and replayer.reset_tasks(entries):
+        print("🔄 タスクをリセットしました")
+
+    replayer.replay(entries)
+    replayer.print_report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Unity Task Management - バイナリプロトコルの単体テスト
+"""
+
+import io
+
+import msgpack
+import pytest
+
+from utils.binary_protocol import (
+    HEADER, MAX_FRAME_SIZE, FrameError, encode_frame, read_frame, observation_to_text, compact_decision
+)
+
+
+def test_round_trip():
+    frames = [{"id": 1, "task": "鍵を開ける"}, {"id": 2, "flags": {"has_key": True}}]
+    stream = io.BytesIO(b"".join(encode_frame(frame) for frame in frames))
+    assert read_frame(stream) == frames[0]
+    assert read_frame(stream) == frames[1]
+    assert read_frame(stream) is None  # 接続が閉じられた
+
+
+def test_truncated_header():
+    with pytest.raises(FrameError):
+        read_frame(io.BytesIO(encode_frame({"id": 1})[:2]))
+
+
+def test_truncated_body():
+    with pytest.raises(FrameError):
+        read_frame(io.BytesIO(encode_frame({"id": 1, "task": "鍵を開ける"})[:-1]))
+
+
+def test_oversized_frame_is_rejected_before_reading_body():
+    stream = io.BytesIO(HEADER.pack(MAX_FRAME_SIZE + 1))
+    with pytest.raises(FrameError, match="too large"):
+        read_frame(stream)
+
+
+def test_frame_must_be_a_map():
+    body = msgpack.packb([1, 2, 3])
+    with pytest.raises(FrameError):
+        read_frame(io.BytesIO(HEADER.pack(len(body)) + body))
+
+
+def test_observation_to_text():
+    player_status, surroundings = observation_to_text({
+        "status": "ドアの前にいる",
+        "flags": {"has_key": True, "door_unlocked": False},
+        "pos": {"player": [1.234, 0, -3.5]},
+        "surroundings": "廊下"
+    })
+    assert player_status == "ドアの前にいる\nhas_key: true\ndoor_unlocked: false"
+    assert surroundings == "廊下\nplayer: (1.23, 0.00, -3.50)"
+
+
+def test_observation_to_text_without_optional_fields():
+    assert observation_to_text({"task": "鍵を開ける"}) == ("", "")
+
+
+def test_compact_decision():
+    result = {
+        "success": True,
+        "data": {
+            "action": "next",
+            "task_id": "step3",
+            "next_task": {"step": "step3", "task": {"description": "..."}},
+            "completed_steps": ["step1", "step2"],
+            "raw_response": "next step3"
+        }
+    }
+    assert compact_decision(7, result) == {
+        "id": 7, "ok": True, "action": "next", "task_id": "step3",
+        "next_step": "step3", "completed_steps": ["step1", "step2"]
+    }
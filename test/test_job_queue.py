@@ -0,0 +1,68 @@
+"""
+Unity Task Management - 非同期判定ジョブキューの単体テスト
+"""
+
+import threading
+
+import pytest
+
+from utils.job_queue import JudgmentJobQueue, JobQueueFullError
+
+
+def test_job_result_and_callback():
+    jobs = JudgmentJobQueue(handler=lambda payload: {"echo": payload}, workers=1)
+    jobs.start()
+    notified = []
+    done = threading.Event()
+
+    def on_done(job):
+        notified.append(job["status"])
+        done.set()
+
+    job = jobs.submit("frame", on_done=on_done)
+    result = jobs.get(job["job_id"], wait=5)
+    assert result["status"] == "done"
+    assert result["result"] == {"echo": "frame"}
+    assert done.wait(5)
+    assert notified == ["done"]
+
+
+def test_failed_job_keeps_error():
+    def handler(payload):
+        raise RuntimeError("boom")
+
+    jobs = JudgmentJobQueue(handler=handler, workers=1)
+    jobs.start()
+    job = jobs.get(jobs.submit(None)["job_id"], wait=5)
+    assert job["status"] == "failed"
+    assert job["error"] == "boom"
+
+
+def test_queue_full():
+    # ワーカーを起動しないのでジョブは溜まり続ける
+    jobs = JudgmentJobQueue(handler=lambda payload: {}, workers=1, max_queue=2)
+    jobs.submit(1)
+    jobs.submit(2)
+    with pytest.raises(JobQueueFullError):
+        jobs.submit(3)
+    assert jobs.stats()["queued"] == 2
+
+
+def test_unknown_job():
+    jobs = JudgmentJobQueue(handler=lambda payload: {})
+    assert jobs.get("missing") is None
+
+
+def test_queued_job_outlives_result_ttl():
+    """キュー待ちが結果の保持期限より長くても、ジョブは消えずに実行・通知される"""
+    jobs = JudgmentJobQueue(handler=lambda payload: {"echo": payload}, workers=1, result_ttl=0)
+    done = threading.Event()
+    job_id = jobs.submit("frame", on_done=lambda job: done.set())["job_id"]
+    jobs._last_sweep = 0.0
+    assert jobs.get(job_id)["status"] == "queued"
+
+    jobs.start()
+    assert done.wait(5)
+    # 完了後は保持期限（0秒）が過ぎれば削除される
+    jobs._last_sweep = 0.0
+    assert jobs.get(job_id) is None
@@ -0,0 +1,101 @@
+"""
+Unity Task Management - オンデマンドプロファイラの単体テスト
+"""
+
+import marshal
+import threading
+import time
+
+import pytest
+
+from utils.profiler import RequestProfiler, ProfilerBusyError, render_capture
+
+
+def busy_work():
+    return sum(i * i for i in range(20000))
+
+
+def run_in_background(profiler: RequestProfiler, mode: str, duration: float):
+    """run_session を別スレッドで実行し、(スレッド, 結果を入れるリスト) を返す"""
+    captures = []
+    thread = threading.Thread(target=lambda: captures.append(profiler.run_session(mode, duration)))
+    thread.start()
+    while profiler._session is None:
+        time.sleep(0.001)
+    return thread, captures
+
+
+def test_single_request_capture():
+    profiler = RequestProfiler()
+    token = profiler.begin_request(single=True)
+    busy_work()
+    profiler.end_request(token)
+
+    capture = profiler.get_capture(token["session"]["capture_id"])
+    assert capture["requests"] == 1
+    body, content_type = render_capture(capture)
+    assert "busy_work" in body
+    assert content_type.startswith("text/plain")
+    assert isinstance(marshal.loads(render_capture(capture, "raw")[0]), dict)
+
+
+def test_no_session_means_no_profiling():
+    assert RequestProfiler().begin_request() is None
+
+
+def test_invalid_mode_and_busy():
+    profiler = RequestProfiler()
+    with pytest.raises(ValueError):
+        profiler.run_session("unknown", 0)
+
+    thread, _ = run_in_background(profiler, "cprofile", 0.2)
+    with pytest.raises(ProfilerBusyError):
+        profiler.run_session("cprofile", 0)
+    thread.join()
+
+
+def test_cprofile_session_collects_requests():
+    profiler = RequestProfiler()
+    thread, captures = run_in_background(profiler, "cprofile", 0.2)
+    token = profiler.begin_request()
+    busy_work()
+    profiler.end_request(token)
+    thread.join()
+
+    assert captures[0]["requests"] == 1
+    assert "busy_work" in render_capture(captures[0])[0]
+
+
+def test_request_finishing_after_session_is_dropped():
+    """セッション終了後に終わったリクエストで、返却済みの結果が変わらない"""
+    profiler = RequestProfiler()
+    thread, captures = run_in_background(profiler, "cprofile", 0.05)
+    token = profiler.begin_request()
+    thread.join()
+    busy_work()
+    profiler.end_request(token)
+
+    capture = profiler.get_capture(captures[0]["capture_id"])
+    assert capture["requests"] == 0
+    assert capture["stats"] is None
+
+
+def test_sample_session():
+    profiler = RequestProfiler()
+    release = threading.Event()
+
+    def handle_request():
+        token = profiler.begin_request()
+        release.wait(5)
+        profiler.end_request(token)
+
+    thread, captures = run_in_background(profiler, "sample", 0.1)
+    worker = threading.Thread(target=handle_request)
+    worker.start()
+    thread.join()
+    release.set()
+    worker.join()
+
+    capture = captures[0]
+    assert capture["requests"] == 1
+    assert "handle_request" in render_capture(capture)[0]
@@ -0,0 +1,97 @@
+"""
+Unity Task Management - シナリオカタログの単体テスト
+"""
+
+import json
+import os
+
+import pytest
+
+from utils.scenario_catalog import ScenarioCatalog, ScenarioNotFoundError
+
+
+def write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def write_scenario(directory, name: str, description: str):
+    write_json(os.path.join(directory, name), {
+        "tasks": {"step1": {"description": description, "completed": False}},
+        "task_order": ["step1"]
+    })
+
+
+def bump_mtime(path):
+    """同じ秒内の書き換えでも変更として検出されるよう mtime をずらす"""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def scenario_dir(tmp_path):
+    for name in ("a", "b", "c"):
+        write_scenario(tmp_path, f"{name}.json", f"シナリオ {name}")
+    write_json(tmp_path / "index.json", {"scenarios": {name: {"file": f"{name}.json"} for name in ("a", "b", "c")}})
+    return tmp_path
+
+
+def test_lazy_load_and_lru_eviction(scenario_dir):
+    catalog = ScenarioCatalog(str(scenario_dir), cache_size=2)
+    assert not any(entry["loaded"] for entry in catalog.list_scenarios())
+
+    first = catalog.get("a")
+    catalog.get("b")
+    assert catalog.get("a") is first  # キャッシュから返し、最近使ったものとして扱う
+    catalog.get("c")
+
+    loaded = {entry["scenario_id"] for entry in catalog.list_scenarios() if entry["loaded"]}
+    assert loaded == {"a", "c"}
+
+
+def test_unknown_scenario(scenario_dir):
+    catalog = ScenarioCatalog(str(scenario_dir))
+    with pytest.raises(ScenarioNotFoundError):
+        catalog.get("missing")
+
+
+def test_check_for_changes_reloads_modified_scenario(scenario_dir):
+    catalog = ScenarioCatalog(str(scenario_dir))
+    before = catalog.get("a")
+    untouched = catalog.get("b")
+
+    write_scenario(scenario_dir, "a.json", "書き換えたシナリオ")
+    bump_mtime(scenario_dir / "a.json")
+    catalog.check_for_changes()
+
+    after = catalog.get("a")
+    assert after is not before
+    assert after.digest != before.digest
+    assert after.tasks["step1"]["description"] == "書き換えたシナリオ"
+    assert catalog.get("b") is untouched
+
+
+def test_check_for_changes_keeps_old_definition_on_broken_file(scenario_dir):
+    catalog = ScenarioCatalog(str(scenario_dir))
+    before = catalog.get("a")
+
+    (scenario_dir / "a.json").write_text("{broken", encoding="utf-8")
+    bump_mtime(scenario_dir / "a.json")
+    catalog.check_for_changes()
+    assert catalog.get("a") is before
+
+
+def test_index_changes_evict_cached_scenarios(scenario_dir):
+    catalog = ScenarioCatalog(str(scenario_dir))
+    catalog.get("a")
+    catalog.get("b")
+
+    # a は別ファイルを参照するよう変更、b はインデックスから削除
+    write_scenario(scenario_dir, "a2.json", "新しいファイル")
+    write_json(scenario_dir / "index.json", {"scenarios": {"a": {"file": "a2.json"}, "c": {"file": "c.json"}}})
+    bump_mtime(scenario_dir / "index.json")
+    catalog.check_for_changes()
+
+    assert catalog.get("a").tasks["step1"]["description"] == "新しいファイル"
+    with pytest.raises(ScenarioNotFoundError):
+        catalog.get("b")
@@ -0,0 +1,54 @@
+"""
+Unity Task Management - TaskManager の単体テスト（保存しないメモリ上のセッションで実行）
+"""
+
+import pytest
+
+
+def test_complete_current_task_with_stale_expected_step(make_manager):
+    manager = make_manager()
+    assert manager.complete_current_task(expected_step="step1") is True
+    # 同じ観測から2回目の判定が来ても二重に進めない
+    assert manager.complete_current_task(expected_step="step1") is None
+    assert manager.current_step == "step2"
+
+
+def test_advance_through(make_manager):
+    manager = make_manager()
+    has_next, completed = manager.advance_through("step3", expected_step="step1")
+    assert has_next is True
+    assert completed == ["step1", "step2", "step3"]
+    assert manager.current_step == "step4"
+
+
+def test_advance_through_stale_target(make_manager):
+    """既に通り過ぎたstepを指定された場合は何もしない"""
+    manager = make_manager()
+    manager.advance_through("step2")
+
+    has_next, completed = manager.advance_through("step1")
+    assert (has_next, completed) == (True, [])
+    assert manager.current_step == "step3"
+
+
+def test_advance_through_stale_expected_step(make_manager):
+    """判定中に他のリクエストで進んでいた場合は何もしない"""
+    manager = make_manager()
+    manager.complete_current_task()
+
+    has_next, completed = manager.advance_through("step3", expected_step="step1")
+    assert completed == []
+    assert manager.current_step == "step2"
+    assert not manager.tasks["step3"]["completed"]
+
+
+def test_advance_through_out_of_range_target(make_manager):
+    """判定開始時のタスクのままなのに前のstep・未知のstepを答えた場合は誤判定として扱う"""
+    manager = make_manager()
+    manager.complete_current_task()
+
+    with pytest.raises(ValueError):
+        manager.advance_through("step1", expected_step="step2")
+    with pytest.raises(ValueError):
+        manager.advance_through("step99", expected_step="step2")
+    assert manager.current_step == "step2"
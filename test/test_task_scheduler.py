@@ -0,0 +1,100 @@
+"""
+Unity Task Management - タスク期限スケジューラの単体テスト
+"""
+
+from utils.task_scheduler import TaskDeadlineScheduler
+from utils.timer_wheel import TimerWheel
+
+
+def make_scheduler(auto_progression: bool = True, idle_timeout: float = 0, on_evict=None):
+    wheel = TimerWheel(tick=1, slots=8)
+    scheduler = TaskDeadlineScheduler(
+        wheel,
+        task_timeout=3,
+        auto_progression=auto_progression,
+        idle_timeout=idle_timeout,
+        on_evict=on_evict
+    )
+    return wheel, scheduler
+
+
+def test_deadline_auto_progresses(make_manager, advance):
+    wheel, scheduler = make_scheduler()
+    manager = make_manager()
+    scheduler.touch("s1", manager)
+
+    advance(wheel, 3)
+    assert manager.current_step == "step2"
+    events = scheduler.recent_events("s1")
+    assert [(e["type"], e["step"], e["next_step"]) for e in events] == [("task_timeout", "step1", "step2")]
+
+
+def test_deadline_after_step_advanced(make_manager, advance):
+    """期限前に判定で進んでいたら、古い期限では進めず新しいタスクの期限を張り直す"""
+    wheel, scheduler = make_scheduler()
+    manager = make_manager()
+    scheduler.touch("s1", manager)
+
+    advance(wheel, 1)
+    manager.complete_current_task()
+    advance(wheel, 2)
+    assert manager.current_step == "step2"
+    assert scheduler.recent_events() == []
+
+    advance(wheel, 3)
+    assert manager.current_step == "step3"
+
+
+def test_deadline_when_step_advances_during_callback(make_manager, advance):
+    """期限の確認後に判定で進んだ場合も二重に進めない"""
+    wheel, scheduler = make_scheduler()
+    manager = make_manager()
+    scheduler.touch("s1", manager)
+
+    original = manager.complete_current_task
+
+    def judged_first(expected_step=None):
+        original()
+        return original(expected_step=expected_step)
+
+    manager.complete_current_task = judged_first
+    advance(wheel, 3)
+    assert manager.current_step == "step2"
+    assert scheduler.recent_events() == []
+
+
+def test_deadline_without_auto_progression_only_records(make_manager, advance):
+    wheel, scheduler = make_scheduler(auto_progression=False)
+    manager = make_manager()
+    scheduler.touch("s1", manager)
+
+    advance(wheel, 3)
+    assert manager.current_step == "step1"
+    assert scheduler.recent_events("s1")[0]["auto_progressed"] is False
+
+
+def test_idle_session_is_evicted(make_manager, advance):
+    evicted = []
+    wheel, scheduler = make_scheduler(auto_progression=False, idle_timeout=2, on_evict=evicted.append)
+    scheduler.touch("s1", make_manager())
+    scheduler.touch(None, make_manager())
+
+    advance(wheel, 2)
+    # 従来のグローバル進行（"default"）は無操作でも破棄しない
+    assert evicted == ["s1"]
+    assert [e["type"] for e in scheduler.recent_events("s1")] == ["session_evicted"]
+
+
+def test_idle_timer_rescheduled_after_firing_does_not_evict(make_manager):
+    """無操作タイマーの発火直後にリクエストが来て張り直された場合は、古いタイマーでは破棄しない"""
+    evicted = []
+    wheel, scheduler = make_scheduler(auto_progression=False, idle_timeout=2, on_evict=evicted.append)
+    manager = make_manager()
+    scheduler.touch("s1", manager)
+    fired_timer = scheduler._tracked["s1"]["idle_timer"]
+
+    scheduler.touch("s1", manager)
+    scheduler._on_idle("s1", fired_timer)
+    assert evicted == []
+    assert scheduler.recent_events() == []
+    assert len(wheel) == 2  # 期限タイマーと張り直した無操作タイマーは残る
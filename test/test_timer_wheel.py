@@ -0,0 +1,59 @@
+"""
+Unity Task Management - タイマーホイールの単体テスト
+ティックは手動で進める（バックグラウンドスレッドは使わない）
+"""
+
+from utils.timer_wheel import TimerWheel
+
+
+def test_fires_after_delay(advance):
+    wheel = TimerWheel(tick=1, slots=8)
+    fired = []
+    wheel.schedule(3, lambda: fired.append("a"))
+
+    advance(wheel, 2)
+    assert fired == []
+    advance(wheel, 1)
+    assert fired == ["a"]
+    assert len(wheel) == 0
+
+
+def test_delay_longer_than_one_turn(advance):
+    """1周（slots ティック）より長い期限は周回数ぶん待ってから発火する"""
+    wheel = TimerWheel(tick=1, slots=8)
+    fired = []
+    wheel.schedule(8, lambda: fired.append(8))
+    wheel.schedule(20, lambda: fired.append(20))
+
+    advance(wheel, 7)
+    assert fired == []
+    advance(wheel, 1)
+    assert fired == [8]
+    advance(wheel, 11)
+    assert fired == [8]
+    advance(wheel, 1)
+    assert fired == [8, 20]
+    assert len(wheel) == 0
+
+
+def test_cancel(advance):
+    wheel = TimerWheel(tick=1, slots=8)
+    fired = []
+    timer_id = wheel.schedule(2, lambda: fired.append("cancelled"))
+    wheel.schedule(2, lambda: fired.append("kept"))
+
+    assert wheel.cancel(timer_id)
+    assert not wheel.cancel(timer_id)
+    assert not wheel.cancel(None)
+    advance(wheel, 16)
+    assert fired == ["kept"]
+
+
+def test_callback_error_does_not_stop_other_timers(advance):
+    wheel = TimerWheel(tick=1, slots=8)
+    fired = []
+    wheel.schedule(1, lambda: 1 / 0)
+    wheel.schedule(1, lambda: fired.append("ok"))
+
+    advance(wheel, 1)
+    assert fired == ["ok"]
@@ -0,0 +1,43 @@
+"""
+Unity Task Management - トークン台帳の単体テスト
+"""
+
+from utils.token_ledger import TokenLedger, DEGRADE_NONE, DEGRADE_CHEAP, DEGRADE_MINIMAL
+
+
+def test_degradation_levels():
+    ledger = TokenLedger(session_budget=100, minimal_ratio=1.5)
+    assert ledger.degradation_level("s1") == DEGRADE_NONE
+    ledger.record("s1", "step1", "model", 80, 20)
+    assert ledger.degradation_level("s1") == DEGRADE_CHEAP
+    ledger.record("s1", "step1", "model", 50, 0)
+    assert ledger.degradation_level("s1") == DEGRADE_MINIMAL
+
+
+def test_sessionless_requests_are_not_budgeted():
+    ledger = TokenLedger(session_budget=100)
+    ledger.record(TokenLedger.DEFAULT_SESSION, "step1", "model", 1000, 0)
+    assert ledger.degradation_level(TokenLedger.DEFAULT_SESSION) == DEGRADE_NONE
+
+
+def test_reset_session_restores_budget():
+    ledger = TokenLedger(session_budget=100)
+    ledger.record("s1", "step1", "model", 200, 0)
+    ledger.mark_call("s1")
+    ledger.reset_session("s1")
+    assert ledger.degradation_level("s1") == DEGRADE_NONE
+    assert ledger.seconds_since_last_call("s1") == float("inf")
+    # タスク別の集計は残す
+    assert ledger.snapshot()["sessions"] == {"s1": 200}
+
+
+def test_budget_is_counted_per_run(tmp_path):
+    ledger_file = str(tmp_path / "ledger.json")
+    ledger = TokenLedger(ledger_file=ledger_file, flush_interval=0, session_budget=100)
+    ledger.record("s1", "step1", "model", 150, 50)
+
+    restarted = TokenLedger(ledger_file=ledger_file, session_budget=100)
+    assert restarted.degradation_level("s1") == DEGRADE_NONE
+    assert restarted.snapshot()["entries"] == [
+        {"session_id": "s1", "task": "step1", "model": "model", "prompt_tokens": 150, "completion_tokens": 50, "calls": 1}
+    ]
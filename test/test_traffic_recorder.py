@@ -0,0 +1,70 @@
+"""
+Unity Task Management - トラフィック記録・スタブLLMの単体テスト
+"""
+
+import json
+
+from utils.traffic_recorder import TrafficRecorder, RecordedJudgeSystem, load_trace, trace_files
+
+
+def record(recorder: TrafficRecorder, task: str, action: str = "keep", status: int = 200, arrived_at: float = None, **data):
+    recorder.record(
+        request_data={"current_task": task, "player_status": f"{task} の状況"},
+        result={"data": {"action": action, "task_id": data.get("task_id"), **data}},
+        status=status,
+        latency_ms=1.0,
+        arrived_at=arrived_at
+    )
+
+
+def test_rotation_keeps_backup_count(tmp_path):
+    trace_file = str(tmp_path / "trace.jsonl")
+    recorder = TrafficRecorder(trace_file, max_bytes=200, backup_count=2)
+    for i in range(10):
+        record(recorder, f"task{i}", arrived_at=1000 + i)
+    recorder.close()
+
+    assert trace_files(trace_file) == [f"{trace_file}.2", f"{trace_file}.1", trace_file]
+    for path in trace_files(trace_file):
+        with open(path, encoding="utf-8") as f:
+            assert len(f.read().encode("utf-8")) <= 200
+
+
+def test_load_trace_orders_entries_across_rotated_files(tmp_path):
+    trace_file = str(tmp_path / "trace.jsonl")
+    recorder = TrafficRecorder(trace_file, max_bytes=200, backup_count=10)
+    # 書き込み順（判定の完了順）と到着順が違っても到着順に並べ直す
+    for i in [0, 2, 1, 3, 5, 4, 6]:
+        record(recorder, f"task{i}", arrived_at=1000 + i)
+    recorder.close()
+
+    assert len(trace_files(trace_file)) > 1
+    assert [entry["req"]["current_task"] for entry in load_trace(trace_file)] == [f"task{i}" for i in range(7)]
+
+
+def test_load_trace_skips_truncated_lines(tmp_path):
+    trace_file = tmp_path / "trace.jsonl"
+    trace_file.write_text(json.dumps({"t": 1, "req": {}, "res": {}, "st": 200}) + "\n{\"t\": 2, \"re", encoding="utf-8")
+    assert len(load_trace(str(trace_file))) == 1
+
+
+def test_recorded_judge_system(tmp_path):
+    trace_file = str(tmp_path / "trace.jsonl")
+    recorder = TrafficRecorder(trace_file)
+    record(recorder, "鍵を開ける", action="next", task_id="step2")
+    record(recorder, "PCを用意する", action="next", task_id="step4", completed_steps=["step2", "step3"])
+    record(recorder, "失敗した判定", action="next", task_id="step9", status=500)
+    recorder.close()
+
+    judge = RecordedJudgeSystem(trace_file)
+    result = judge.judge_task_status("鍵を開ける", "鍵を開ける の状況")
+    assert (result["data"]["action"], result["data"]["task_id"]) == ("next", "step2")
+
+    # 先読みモードでは記録時に最後に完了したstepまで進める
+    upcoming = [("step2", "PCを用意する"), ("step3", "ケーブルをつなぐ")]
+    result = judge.judge_task_status("PCを用意する", "PCを用意する の状況", upcoming_tasks=upcoming)
+    assert result["data"]["completed_through"] == "step3"
+
+    # 200以外の記録・未記録の入力は継続扱い
+    assert judge.judge_task_status("失敗した判定", "失敗した判定 の状況")["data"]["action"] == "keep"
+    assert judge.judge_task_status("未記録", "")["data"]["action"] == "keep"